@@ -0,0 +1,126 @@
+"""Side-by-side benchmark of the sync and async database paths.
+
+The sync path mirrors a sync route: a threadpool of ``SessionLocal`` sessions,
+capped at anyio's default of 40 threads. The async path mirrors the async
+routes: ``AsyncSessionLocal`` sessions on one event loop, running the same
+service code through ``run_sync``. Workloads:
+
+- ``analytics``: ``SalesService.get_sales_analytics`` over the last year
+- ``inventory``: ``InventoryService.update_inventory`` (``stock_in`` of 1) on
+  rotating inventory rows, a short write that commits per call
+
+    python -m benchmarks.async_vs_sync --concurrency 10 50 200 --requests 2000
+    python -m benchmarks.async_vs_sync --workload inventory
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Inventory
+from schemas import ChangeType, InventoryUpdate
+from services.inventory_service import InventoryService
+from services.sales_service import SalesService
+
+THREADPOOL_SIZE = 40
+
+
+def analytics(session, i):
+    end_date = datetime.utcnow()
+    SalesService(session).get_sales_analytics(end_date - timedelta(days=365), end_date)
+
+
+def inventory_workload():
+    db = SessionLocal()
+    try:
+        inventory_ids = db.scalars(
+            select(Inventory.id).order_by(Inventory.id).limit(1000)
+        ).all()
+    finally:
+        db.close()
+    if not inventory_ids:
+        raise SystemExit("No inventory found; seed the database first")
+    update = InventoryUpdate(
+        change_type=ChangeType.STOCK_IN, quantity_change=1, reason="Benchmark"
+    )
+
+    def inventory(session, i):
+        InventoryService(session).update_inventory(
+            inventory_ids[i % len(inventory_ids)], update
+        )
+
+    return inventory
+
+
+def sync_call(work, i):
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        work(db, i)
+    finally:
+        db.close()
+    return time.perf_counter() - started
+
+
+async def async_call(work, i, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(work, i)
+        return time.perf_counter() - started
+
+
+def run_sync(work, concurrency, requests):
+    workers = min(concurrency, THREADPOOL_SIZE)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(lambda i: sync_call(work, i), range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+async def run_async(work, concurrency, requests):
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(async_call(work, i, semaphore) for i in range(requests))
+    )
+    return latencies, time.perf_counter() - started
+
+
+def summarize(label, concurrency, latencies, elapsed):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<6} c={concurrency:<5} {len(latencies) / elapsed:>9.1f} req/s  "
+        f"p50={quantiles[49] * 1000:>8.2f}ms  p95={quantiles[94] * 1000:>8.2f}ms  "
+        f"p99={quantiles[98] * 1000:>8.2f}ms"
+    )
+
+
+async def compare(work, levels, requests):
+    # One event loop for the whole run: pooled asyncpg connections are bound to
+    # the loop that opened them. The sync path blocks it while it runs alone.
+    for concurrency in levels:
+        summarize("sync", concurrency, *run_sync(work, concurrency, requests))
+        summarize("async", concurrency, *await run_async(work, concurrency, requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--workload", choices=["analytics", "inventory"], default="analytics"
+    )
+    args = parser.parse_args()
+
+    work = analytics if args.workload == "analytics" else inventory_workload()
+    asyncio.run(compare(work, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
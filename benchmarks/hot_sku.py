@@ -0,0 +1,101 @@
+"""Concurrency check for stock updates: many workers selling one hot SKU.
+
+Needs the API running (``uvicorn main:app``) and the same database configured
+in the environment, which is used to set up and verify the stock count.
+
+    python -m benchmarks.hot_sku --base-url http://localhost:8000 --workers 50 --sales 2000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from database import SessionLocal
+from models import Inventory
+from schemas import ChangeType, InventoryUpdate
+from services.inventory_service import InventoryService
+
+
+def prepare_stock(sales: int):
+    """Top the hottest SKU up so every sale can be served; return its ids."""
+    db = SessionLocal()
+    try:
+        inventory = db.query(Inventory).order_by(Inventory.id).first()
+        if inventory.quantity < sales:
+            InventoryService(db).update_inventory(
+                inventory.id,
+                InventoryUpdate(
+                    change_type=ChangeType.STOCK_IN,
+                    quantity_change=sales - inventory.quantity,
+                    reason="hot_sku benchmark",
+                ),
+            )
+        inventory = db.get(Inventory, inventory.id, populate_existing=True)
+        return inventory.id, inventory.product_id, inventory.quantity
+    finally:
+        db.close()
+
+
+def current_quantity(inventory_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.get(Inventory, inventory_id).quantity
+    finally:
+        db.close()
+
+
+async def hammer(base_url: str, product_id: int, workers: int, sales: int):
+    remaining = iter(range(sales))
+    failures = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal failures
+        for index in remaining:
+            response = await client.post(
+                "/sales/",
+                json={
+                    "product_id": product_id,
+                    "quantity": 1,
+                    "unit_price": "1.00",
+                    "order_id": f"HOT-{index}",
+                },
+            )
+            if response.status_code != 200:
+                failures += 1
+
+    limits = httpx.Limits(max_connections=workers)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(workers)))
+        return time.perf_counter() - started, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--workers", type=int, default=50)
+    parser.add_argument("--sales", type=int, default=2000)
+    args = parser.parse_args()
+
+    inventory_id, product_id, before = prepare_stock(args.sales)
+    elapsed, failures = asyncio.run(
+        hammer(args.base_url, product_id, args.workers, args.sales)
+    )
+    after = current_quantity(inventory_id)
+
+    expected = before - (args.sales - failures)
+    print(
+        f"{args.sales} sales from {args.workers} workers in {elapsed:.2f}s "
+        f"({args.sales / elapsed:.1f} sales/s, {failures} failed)"
+    )
+    print(f"stock: before={before} after={after} expected={expected}")
+    if after != expected:
+        raise SystemExit(f"Lost updates detected: {after - expected:+d} units")
+    print("OK: no lost updates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Windowed query latency on the partitioned sales table versus a plain copy.
+
+Copies ``sales`` into an unpartitioned table with the same indexes, then runs
+the date-windowed queries the API issues against both, alternating between
+them, and reports p50/p95 per query and table. The copy is dropped afterwards
+unless ``--keep`` is given. Seed the database first (``benchmarks.seed``).
+
+    python -m benchmarks.partitioning --repeat 200
+"""
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from database import engine
+
+PLAIN_TABLE = "sales_unpartitioned_bench"
+EDGE = timedelta(hours=6)  # partial days at either end of an analytics window
+
+# Every query is bounded to ``days`` ending at the newest sale. The bounds are
+# bound as values, as the API does, so the planner can prune partitions.
+QUERIES = {
+    "month_totals": (
+        30,
+        "SELECT sum(total_amount), count(*), sum(quantity) FROM {table} "
+        "WHERE sale_date > :start AND sale_date <= :end",
+    ),
+    "edge_hours": (
+        30,
+        "SELECT product_id, sum(total_amount), count(*) FROM {table} "
+        "WHERE (sale_date > :start AND sale_date < :start_edge) "
+        "OR (sale_date >= :end_edge AND sale_date <= :end) "
+        "GROUP BY product_id",
+    ),
+    "product_quarter": (
+        90,
+        "SELECT sum(total_amount), count(*) FROM {table} "
+        "WHERE product_id = :product_id AND sale_date > :start AND sale_date <= :end",
+    ),
+    "daily_series": (
+        60,
+        "SELECT date_trunc('day', sale_date), sum(total_amount) FROM {table} "
+        "WHERE sale_date > :start AND sale_date <= :end GROUP BY 1 ORDER BY 1",
+    ),
+    "window_page": (
+        14,
+        "SELECT id, sale_date, total_amount FROM {table} "
+        "WHERE sale_date > :start AND sale_date <= :end "
+        "ORDER BY sale_date DESC, id DESC LIMIT 50",
+    ),
+}
+
+
+def create_plain_copy(conn):
+    print(f"Copying sales into {PLAIN_TABLE}...")
+    conn.execute(text(f"DROP TABLE IF EXISTS {PLAIN_TABLE}"))
+    conn.execute(text(f"CREATE TABLE {PLAIN_TABLE} AS SELECT * FROM sales"))
+    conn.execute(text(f"ALTER TABLE {PLAIN_TABLE} ADD PRIMARY KEY (id)"))
+    for columns in ("sale_date, id", "product_id, sale_date", "platform"):
+        conn.execute(text(f"CREATE INDEX ON {PLAIN_TABLE} ({columns})"))
+    conn.execute(text(f"ANALYZE {PLAIN_TABLE}"))
+
+
+def partitions_scanned(conn, sql, params) -> int:
+    plan = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()
+    pending, scanned = [plan[0]["Plan"]], set()
+    while pending:
+        node = pending.pop()
+        if node.get("Relation Name", "").startswith("sales_"):
+            scanned.add(node["Relation Name"])
+        pending.extend(node.get("Plans", []))
+    return len(scanned)
+
+
+def time_query(conn, sql, params) -> float:
+    started = time.perf_counter()
+    conn.execute(text(sql), params).all()
+    return time.perf_counter() - started
+
+
+def summarize(name, table, latencies, partitions):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<16} {table:<12} p50={quantiles[49] * 1000:>8.2f}ms  "
+        f"p95={quantiles[94] * 1000:>8.2f}ms  partitions={partitions}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument(
+        "--only", nargs="+", choices=sorted(QUERIES), help="Run only these queries"
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help=f"Keep {PLAIN_TABLE} for later runs"
+    )
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        end, product_id = conn.execute(
+            text(
+                "SELECT max(sale_date), (SELECT product_id FROM sales "
+                "GROUP BY product_id ORDER BY count(*) DESC LIMIT 1) FROM sales"
+            )
+        ).one()
+        if end is None:
+            raise SystemExit("sales is empty; seed the database first")
+        create_plain_copy(conn)
+
+        try:
+            for name in args.only or QUERIES:
+                days, template = QUERIES[name]
+                start = end - timedelta(days=days)
+                params = {
+                    "start": start,
+                    "end": end,
+                    "start_edge": start + EDGE,
+                    "end_edge": end - EDGE,
+                    "product_id": product_id,
+                }
+                tables = {"partitioned": "sales", "plain": PLAIN_TABLE}
+                latencies = {label: [] for label in tables}
+                for label, table in tables.items():
+                    time_query(conn, template.format(table=table), params)  # warm up
+                for _ in range(args.repeat):
+                    for label, table in tables.items():
+                        sql = template.format(table=table)
+                        latencies[label].append(time_query(conn, sql, params))
+                pruned = partitions_scanned(
+                    conn, template.format(table="sales"), params
+                )
+                summarize(name, "partitioned", latencies["partitioned"], pruned)
+                summarize(name, "plain", latencies["plain"], "-")
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP TABLE {PLAIN_TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
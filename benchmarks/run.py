@@ -0,0 +1,453 @@
+"""Drive every API route with concurrent clients and record latency percentiles.
+
+Seed a benchmark database first (``python -m benchmarks.seed``), start the API
+against it, then:
+
+    python -m benchmarks.run --base-url http://localhost:8000 --concurrency 32
+    python -m benchmarks.run --only analytics search --compare benchmarks/results/base.json
+
+Results go to a JSON file (``benchmarks/results/<timestamp>.json`` by default)
+holding run metadata and p50/p95/p99 latency and throughput per scenario.
+``--compare`` prints the change against an earlier file and exits non-zero
+when any scenario's p95 regressed by more than ``--fail-threshold`` percent.
+Set ``ANALYTICS_CACHE_TTL=0`` on the server to measure uncached analytics.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import engine
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+@dataclass
+class Scenario:
+    name: str
+    group: str
+    method: str
+    path: Callable[[int, Dict[str, Any]], str]
+    body: Optional[Callable[[int, Dict[str, Any]], Any]] = None
+    # Send ``body`` as raw content of this type instead of as JSON.
+    content_type: Optional[str] = None
+
+
+def _sale(i: int, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "product_id": ctx["product_ids"][i % len(ctx["product_ids"])],
+        "quantity": 1,
+        "unit_price": "19.99",
+        "platform": "Amazon" if i % 2 else "Walmart",
+        "order_id": f"BENCH-{ctx['run_id']}-{i}",
+    }
+
+
+def _month_ago(i: int, ctx: Dict[str, Any]) -> str:
+    return (datetime.utcnow() - timedelta(days=30)).replace(microsecond=0).isoformat()
+
+
+def _halfway(created_at: str) -> str:
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    now = datetime.now(timezone.utc)
+    return (created + (now - created) / 2).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _import_products(i: int, ctx: Dict[str, Any]) -> str:
+    return "".join(
+        json.dumps(
+            {
+                "name": f"Imported product {i}-{n}",
+                "sku": f"BI{ctx['run_id']}-{i}-{n}",
+                "price": "10.00",
+                "cost": "4.00",
+                "category_id": ctx["category_id"],
+            }
+        )
+        + "\n"
+        for n in range(100)
+    )
+
+
+def _inventory_batch(i: int, ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    ids = ctx["inventory_ids"]
+    return [
+        {
+            "inventory_id": ids[(i * 100 + n) % len(ids)],
+            "change_type": "stock_in",
+            "quantity_change": 1,
+        }
+        for n in range(100)
+    ]
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("health", "health", "GET", lambda i, c: "/health"),
+    Scenario("health_pool", "health", "GET", lambda i, c: "/health/pool"),
+    Scenario("health_cache", "health", "GET", lambda i, c: "/health/cache"),
+    Scenario("metrics", "health", "GET", lambda i, c: "/metrics"),
+    Scenario("categories_list", "listing", "GET", lambda i, c: "/categories/"),
+    Scenario("products_list_100", "listing", "GET", lambda i, c: "/products/"),
+    Scenario(
+        "products_list_1000", "listing", "GET", lambda i, c: "/products/?limit=1000"
+    ),
+    Scenario(
+        "products_low_stock",
+        "listing",
+        "GET",
+        lambda i, c: "/products/?low_stock_only=true",
+    ),
+    Scenario("inventory_list", "listing", "GET", lambda i, c: "/inventory/"),
+    Scenario(
+        "inventory_low_stock", "listing", "GET", lambda i, c: "/inventory/low-stock"
+    ),
+    Scenario(
+        "inventory_history",
+        "listing",
+        "GET",
+        lambda i, c: "/inventory/{}/history?at={}".format(
+            *c["history_points"][i % len(c["history_points"])]
+        ),
+    ),
+    Scenario("sales_list_100", "listing", "GET", lambda i, c: "/sales/"),
+    Scenario("sales_list_1000", "listing", "GET", lambda i, c: "/sales/?limit=1000"),
+    Scenario(
+        "sales_list_deep_offset",
+        "listing",
+        "GET",
+        lambda i, c: f"/sales/?skip={c['deep_offset']}",
+    ),
+    Scenario(
+        "sales_export_month",
+        "listing",
+        "GET",
+        lambda i, c: f"/sales/export?format=ndjson&start_date={_month_ago(i, c)}",
+    ),
+    Scenario(
+        "search_name_prefix",
+        "search",
+        "GET",
+        lambda i, c: f"/products/search?q={c['search_term']}",
+    ),
+    Scenario(
+        "search_exact_sku",
+        "search",
+        "GET",
+        lambda i, c: f"/products/search?q={c['skus'][i % len(c['skus'])]}",
+    ),
+    Scenario(
+        "search_category",
+        "search",
+        "GET",
+        lambda i, c: (
+            f"/products/search?q={c['search_term']}&category_id={c['category_id']}"
+        ),
+    ),
+    *(
+        Scenario(
+            f"analytics_{period}",
+            "analytics",
+            "GET",
+            lambda i, c, period=period: f"/sales/analytics?period={period}",
+        )
+        for period in ("daily", "weekly", "monthly", "annual")
+    ),
+    Scenario(
+        "analytics_annual_category",
+        "analytics",
+        "GET",
+        lambda i, c: f"/sales/analytics?period=annual&category_id={c['category_id']}",
+    ),
+    Scenario(
+        "revenue_comparison_monthly",
+        "analytics",
+        "GET",
+        lambda i, c: "/sales/revenue-comparison?period=monthly",
+    ),
+    Scenario(
+        "timeseries_daily",
+        "analytics",
+        "GET",
+        lambda i, c: "/sales/timeseries?interval=day",
+    ),
+    Scenario(
+        "top_products_monthly",
+        "analytics",
+        "GET",
+        lambda i, c: "/sales/top?dimension=product&period=monthly",
+    ),
+    Scenario(
+        "top_categories_annual_quantity",
+        "analytics",
+        "GET",
+        lambda i, c: "/sales/top?dimension=category&metric=quantity&period=annual",
+    ),
+    Scenario("create_sale", "write", "POST", lambda i, c: "/sales/", _sale),
+    Scenario(
+        "create_sales_batch_100",
+        "write",
+        "POST",
+        lambda i, c: "/sales/batch",
+        lambda i, c: [_sale(i * 100 + n, c) for n in range(100)],
+    ),
+    Scenario(
+        "update_inventory",
+        "write",
+        "PUT",
+        lambda i, c: f"/inventory/{c['inventory_ids'][i % len(c['inventory_ids'])]}",
+        lambda i, c: {"change_type": "stock_in", "quantity_change": 1},
+    ),
+    Scenario(
+        "update_inventory_batch_100",
+        "write",
+        "POST",
+        lambda i, c: "/inventory/batch",
+        _inventory_batch,
+    ),
+    Scenario(
+        "create_category",
+        "write",
+        "POST",
+        lambda i, c: "/categories/",
+        lambda i, c: {"name": f"Bench {c['run_id']}-{i}"},
+    ),
+    Scenario(
+        "create_product",
+        "write",
+        "POST",
+        lambda i, c: "/products/",
+        lambda i, c: {
+            "name": f"Bench product {i}",
+            "sku": f"B{c['run_id']}-{i}",
+            "price": "10.00",
+            "cost": "4.00",
+            "category_id": c["category_id"],
+            "initial_stock": 100,
+        },
+    ),
+    Scenario(
+        "update_product",
+        "write",
+        "PUT",
+        lambda i, c: f"/products/{c['product_ids'][i % len(c['product_ids'])]}",
+        lambda i, c: {"price": "12.50"},
+    ),
+    Scenario(
+        "import_products_100",
+        "write",
+        "POST",
+        lambda i, c: "/products/import",
+        _import_products,
+        content_type="application/x-ndjson",
+    ),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def discover(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Collect ids the write scenarios need from the seeded database."""
+    products = (await client.get("/products/?limit=1000")).json()
+    inventory = (await client.get("/inventory/?limit=1000")).json()
+    if not products or not inventory:
+        raise SystemExit("No products found; seed the database first")
+    return {
+        "run_id": int(time.time()),
+        "product_ids": [product["id"] for product in products],
+        "inventory_ids": [item["id"] for item in inventory],
+        # Halfway through each row's life, so lookups hit logs or snapshots.
+        "history_points": [
+            (item["id"], _halfway(item["product"]["created_at"]))
+            for item in inventory
+            if item["product"]["created_at"]
+        ],
+        "category_id": products[0]["category_id"],
+        "skus": [product["sku"] for product in products],
+        # A word prefix shared by many products, like a user typing a name.
+        "search_term": products[0]["name"].split()[0][:3].lower(),
+        "deep_offset": 10000,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: Dict[str, Any],
+    concurrency: int,
+    requests: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    counter = iter(range(warmup + requests))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            body = scenario.body(i, ctx) if scenario.body else None
+            if scenario.content_type:
+                payload = {
+                    "content": body,
+                    "headers": {"content-type": scenario.content_type},
+                }
+            else:
+                payload = {"json": body}
+            started = time.perf_counter()
+            response = await client.request(
+                scenario.method, scenario.path(i, ctx), **payload
+            )
+            elapsed = time.perf_counter() - started
+            if i < warmup:
+                continue
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "group": scenario.group,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_size() -> Optional[Dict[str, int]]:
+    """Planner row estimates for the seeded tables, so runs at different scales
+    are not compared by mistake. Reads the database ``PG_DATABASE_URL`` names."""
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT relname, reltuples::bigint FROM pg_class "
+                    "WHERE relname IN ('categories', 'products', 'sales') "
+                    "AND relkind IN ('r', 'p')"
+                )
+            )
+            return dict(rows.all())
+    except SQLAlchemyError:
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        ctx = await discover(client)
+        scenarios = [
+            s
+            for s in SCENARIOS
+            if not args.only or s.group in args.only or s.name in args.only
+        ]
+        results = {}
+        for scenario in scenarios:
+            result = await run_scenario(
+                client, scenario, ctx, args.concurrency, args.requests, args.warmup
+            )
+            results[scenario.name] = result
+            print(
+                f"{scenario.name:<28} {result['throughput_rps']:>9.1f} req/s  "
+                f"p50={result['p50_ms']:>8.2f}ms  p95={result['p95_ms']:>8.2f}ms  "
+                f"p99={result['p99_ms']:>8.2f}ms  errors={result['errors']}"
+            )
+
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "git_revision": git_revision(),
+        "label": args.label,
+        "base_url": args.base_url,
+        "dataset": dataset_size(),
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "scenarios": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: str, threshold: float) -> bool:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressed = False
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision')}):")
+    if baseline.get("dataset") != current.get("dataset"):
+        print(f"Warning: dataset differs ({baseline.get('dataset')})")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"{name:<28} p95 {before['p95_ms']:>8.2f}ms -> "
+            f"{result['p95_ms']:>8.2f}ms ({change:+6.1f}%){flag}"
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Per scenario")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument(
+        "--only", nargs="+", help="Scenario names or groups to run (default: all)"
+    )
+    parser.add_argument("--label", help="Free-form note stored with the results")
+    parser.add_argument("--output", help="Results file (default: results/<ts>.json)")
+    parser.add_argument("--compare", help="Earlier results file to diff against")
+    parser.add_argument("--fail-threshold", type=float, default=20.0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.utcnow().strftime("%Y%m%dT%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare and compare(report, args.compare, args.fail_threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Throughput of single-sale ingestion over ``POST /sales/`` under concurrency.
+
+Needs the API running and the same database configured in the environment,
+which is used to pick products and to confirm every sale was committed. Run
+it once against a server with ``SALE_WRITE_BEHIND=false`` (a commit per sale)
+and once with it on (group commits), optionally with ``--no-wait`` to measure
+the accept-and-return mode:
+
+    python -m benchmarks.sale_ingestion --workers 100 --sales 5000 [--no-wait]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import func, select
+
+from database import SessionLocal
+from models import Inventory, Sale
+
+
+def pick_products(count: int):
+    db = SessionLocal()
+    try:
+        return db.scalars(
+            select(Inventory.product_id).order_by(Inventory.id).limit(count)
+        ).all()
+    finally:
+        db.close()
+
+
+def committed_sales(prefix: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).where(Sale.order_id.like(f"{prefix}%")))
+    finally:
+        db.close()
+
+
+async def ingest(base_url, product_ids, workers, sales, wait, prefix):
+    remaining = iter(range(sales))
+    latencies = []
+    failures = rejected = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal failures, rejected
+        for index in remaining:
+            payload = {
+                "product_id": product_ids[index % len(product_ids)],
+                "quantity": 1,
+                "unit_price": "1.00",
+                "order_id": f"{prefix}{index}",
+                "platform": "benchmark",
+            }
+            started = time.perf_counter()
+            try:
+                while True:
+                    response = await client.post(
+                        "/sales/", params={"wait": str(wait).lower()}, json=payload
+                    )
+                    if response.status_code != 503:
+                        break
+                    # Backpressure: the queue is full, retry as the server asks.
+                    rejected += 1
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+            except httpx.TransportError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in (200, 202):
+                failures += 1
+
+    limits = httpx.Limits(max_connections=workers)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(workers)))
+        return time.perf_counter() - started, latencies, failures, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--workers", type=int, default=100)
+    parser.add_argument("--sales", type=int, default=5000)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument(
+        "--no-wait",
+        dest="wait",
+        action="store_false",
+        help="pass wait=false, returning once a sale is queued",
+    )
+    args = parser.parse_args()
+
+    prefix = f"ING-{uuid4().hex[:8]}-"
+    product_ids = pick_products(args.products)
+    started = time.perf_counter()
+    elapsed, latencies, failures, rejected = asyncio.run(
+        ingest(args.base_url, product_ids, args.workers, args.sales, args.wait, prefix)
+    )
+
+    # Accepted sales may still be queued; time until the last one commits.
+    expected = args.sales - failures
+    while committed_sales(prefix) < expected:
+        time.sleep(0.05)
+    durable = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{args.sales} sales from {args.workers} workers in {elapsed:.2f}s "
+        f"({args.sales / elapsed:.1f} sales/s, {failures} failed, "
+        f"{rejected} rejected with 503)"
+    )
+    print(
+        f"latency p50={quantiles[49] * 1000:.2f}ms p95={quantiles[94] * 1000:.2f}ms "
+        f"p99={quantiles[98] * 1000:.2f}ms"
+    )
+    print(f"all {expected} committed after {durable:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Seed a dedicated benchmark database at a preset scale.
+
+Wraps ``seed_data.seed_database`` with fixed scales and its default seed, so
+every run at the same scale benchmarks the same rows. History always ends
+today, which keeps the default analytics windows populated. Existing data in
+every API table is removed first: point ``PG_DATABASE_URL`` at a database used
+only for benchmarking.
+
+    python -m benchmarks.seed --scale 1m
+    python -m benchmarks.seed --scale 10m --workers 8
+"""
+import argparse
+import os
+import time
+
+from seed_data import seed_database
+
+SCALES = {
+    "10k": {"sales": 10_000, "products": 100},
+    "1m": {"sales": 1_000_000, "products": 5_000},
+    "10m": {"sales": 10_000_000, "products": 50_000},
+}
+DAYS = 730
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    preset = SCALES[args.scale]
+    print(f"Seeding {preset['sales']} sales, {preset['products']} products...")
+    started = time.perf_counter()
+    seed_database(days=DAYS, workers=args.workers, **preset)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Fold old inventory log entries into per-inventory snapshots"
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        help="Keep entries from this many days (default: INVENTORY_LOG_RETENTION_DAYS)",
+    )
+    args = parser.parse_args()
+
+    from datetime import datetime, timedelta, timezone
+
+    from database import SessionLocal
+    from services.inventory_history_service import InventoryHistoryService
+
+    cutoff = None
+    if args.retention_days is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.retention_days)
+
+    print("Compacting inventory logs...")
+    db = SessionLocal()
+    try:
+        result = InventoryHistoryService(db).compact(cutoff)
+    finally:
+        db.close()
+
+    print(
+        f"Archived {result['archived_logs']} log entries created before "
+        f"{result['cutoff']:%Y-%m-%d %H:%M} into {result['snapshots']} snapshots."
+    )
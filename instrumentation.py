@@ -0,0 +1,151 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("ecommerce.sql")
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "20"))
+# The same SQL text run this many times in one request is reported as an N+1.
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", "5"))
+
+
+class RequestStats:
+    """SQL statements and timings collected while serving one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statements = Counter()
+
+    def repeated_statements(self) -> list:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= REPEATED_QUERY_THRESHOLD
+        ]
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_sql_stats", default=None
+)
+
+
+@contextmanager
+def measure_serialize():
+    """Count the wrapped block as response serialization time."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current.get()
+        if stats is not None:
+            stats.serialize_seconds += time.perf_counter() - started
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    # Kept on the statement's execution context rather than the connection,
+    # so a statement that raises (no after_cursor_execute) leaves nothing behind.
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+        # One statement over many parameter sets (executemany, or the batches
+        # of an insertmanyvalues INSERT) repeats by design, not as an N+1.
+        if not context.executemany:
+            stats.statements[statement] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute statements run on ``engine`` to the request being served."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _report(
+    method: str, path: str, stats: RequestStats, total_ms: float, long_lived: bool
+) -> None:
+    slow = total_ms >= SLOW_REQUEST_MS and not long_lived
+    if slow or stats.queries >= SLOW_REQUEST_QUERIES:
+        logger.warning(
+            "Slow request %s %s: %.1fms total, %d queries in %.1fms",
+            method,
+            path,
+            total_ms,
+            stats.queries,
+            stats.db_seconds * 1000,
+        )
+    for statement, count in stats.repeated_statements():
+        logger.warning(
+            "Possible N+1 in %s %s: statement ran %d times: %s",
+            method,
+            path,
+            count,
+            " ".join(statement.split())[:300],
+        )
+
+
+class SQLInstrumentationMiddleware:
+    """Adds a ``Server-Timing`` header with db, serialize and total time.
+
+    Pure ASGI rather than ``BaseHTTPMiddleware`` so streamed responses are
+    passed through untouched; for those the timings cover the work done
+    before the first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        long_lived = False
+
+        async def send_with_timing(message):
+            nonlocal long_lived
+            if message["type"] == "http.response.start":
+                # Event streams stay open by design; their duration is not latency.
+                long_lived = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} '
+                    f'queries", serialize;dur={stats.serialize_seconds * 1000:.1f}, '
+                    f"total;dur={total_ms:.1f}"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # Logged against the full duration, including any streamed body.
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            _report(scope["method"], scope["path"], stats, elapsed_ms, long_lived)
@@ -1,17 +1,41 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import engine
+from database import (ReadYourWritesMiddleware, SessionLocal, async_engine,
+                      async_replica_engines, engine, replica_engines)
+from instrumentation import SQLInstrumentationMiddleware, instrument_engine
+from metrics import MetricsMiddleware, start_flushing
 from models import Base
-from routers import categories, health, inventory, products, sales
+from pagination import NEXT_CURSOR_HEADER
+from responses import TimedJSONResponse
+from routers import (categories, events, health, inventory, metrics, products,
+                     sales)
+from services.catalog_cache import start_listening, stop_listening
+from services.partition_service import PartitionService
+from services.sale_queue import start_sale_queue, stop_sale_queue
 
 Base.metadata.create_all(bind=engine)
+with SessionLocal() as db:
+    PartitionService(db).ensure_ahead()
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+for replica in replica_engines:
+    instrument_engine(replica)
+for replica in async_replica_engines:
+    instrument_engine(replica.sync_engine)
 
 app = FastAPI(
     title="Forsit E-Commerce Admin API",
     description="API for e-commerce admin with sales, inventory and low stock management",
+    default_response_class=TimedJSONResponse,
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(SQLInstrumentationMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # Just allowing all origins for debug environment. Must update it if this is to be deployed to prod.
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
 
 # Using routers for better organization of APIs
@@ -26,4 +51,32 @@ app.include_router(categories.router)
 app.include_router(products.router)
 app.include_router(sales.router)
 app.include_router(inventory.router)
+app.include_router(events.router)
 app.include_router(health.router)
+app.include_router(metrics.router)
+
+
+@app.on_event("startup")
+async def start_metrics_flushing():
+    start_flushing()
+
+
+@app.on_event("startup")
+def start_catalog_listener():
+    start_listening()
+
+
+@app.on_event("shutdown")
+def stop_catalog_listener():
+    stop_listening()
+
+
+@app.on_event("startup")
+def start_sale_flusher():
+    start_sale_queue()
+
+
+@app.on_event("shutdown")
+async def flush_sale_queue():
+    # Joining the flusher can take a while; keep the event loop free meanwhile.
+    await run_in_threadpool(stop_sale_queue)
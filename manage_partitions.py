@@ -0,0 +1,73 @@
+import argparse
+from datetime import date
+
+
+def parse_month(value: str) -> date:
+    """Parse ``YYYY-MM`` into the first day of that month."""
+    return date.fromisoformat(f"{value}-01")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage monthly sales partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="Show partitions with sizes and row estimates")
+
+    create = commands.add_parser("create", help="Create missing monthly partitions")
+    create.add_argument(
+        "--ahead", type=int, help="Months after the current one (default: 3)"
+    )
+    create.add_argument(
+        "--from", dest="first", type=parse_month, help="First month (YYYY-MM)"
+    )
+
+    retire = commands.add_parser("detach", help="Detach partitions of old months")
+    retire.add_argument(
+        "--older-than",
+        type=int,
+        required=True,
+        help="Retire months that ended more than this many months ago",
+    )
+    retire.add_argument(
+        "--drop",
+        action="store_true",
+        help="Drop the partitions instead of keeping them",
+    )
+    args = parser.parse_args()
+
+    from datetime import datetime, timezone
+
+    from database import SessionLocal
+    from services.partition_service import (SALES_PARTITIONS_AHEAD,
+                                            PartitionService, add_months,
+                                            month_start)
+
+    this_month = month_start(datetime.now(timezone.utc).date())
+    db = SessionLocal()
+    try:
+        service = PartitionService(db)
+        if not service.is_partitioned():
+            raise SystemExit(
+                "sales is not partitioned; apply migrations/005_partition_sales.sql"
+            )
+
+        if args.command == "list":
+            for partition in service.list_partitions():
+                print(
+                    f"{partition['name']:<16} {partition['bounds']:<80} "
+                    f"~{partition['estimated_rows']} rows, "
+                    f"{partition['total_bytes'] // 1024} kB"
+                )
+        elif args.command == "create":
+            ahead = SALES_PARTITIONS_AHEAD if args.ahead is None else args.ahead
+            created = service.ensure_partitions(
+                args.first or this_month, add_months(this_month, ahead)
+            )
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+        else:
+            cutoff = add_months(this_month, -args.older_than)
+            retired = service.detach_before(cutoff, drop=args.drop)
+            action = "Dropped" if args.drop else "Detached"
+            print(f"{action} {len(retired)} partitions: {', '.join(retired) or '-'}")
+    finally:
+        db.close()
@@ -0,0 +1,261 @@
+"""Request metrics in the Prometheus text exposition format.
+
+Observations are recorded by an ASGI middleware on the event loop thread, so
+the per-worker tables are plain dicts and lists updated without locks. With
+``METRICS_MULTIPROC_DIR`` set, every worker also writes a snapshot of its
+tables to that directory every ``METRICS_FLUSH_INTERVAL`` seconds and
+``/metrics`` merges the snapshots, so any worker can answer a scrape.
+"""
+import asyncio
+import bisect
+import json
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from database import get_pool_status
+from services.analytics_cache import analytics_cache
+from services.catalog_cache import catalog_cache
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetrics:
+    """Request counts, latency histograms and in-flight requests for one worker."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # (method, route, status) -> [count, sum, per-bucket counts..., +Inf]
+        self.series: Dict[tuple, List[float]] = {}
+        self.in_flight = Counter()
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, str(status))
+        values = self.series.get(key)
+        if values is None:
+            values = self.series[key] = [0] * (len(self.buckets) + 3)
+        values[0] += 1
+        values[1] += seconds
+        values[2 + bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "series": [[*key, list(values)] for key, values in self.series.items()],
+            "in_flight": dict(self.in_flight),
+            "pool": get_pool_status(),
+            "cache": {
+                "analytics": analytics_cache.stats(),
+                "catalog": catalog_cache.stats(),
+            },
+        }
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and labels it with its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        request_metrics.in_flight[method] += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight[method] -= 1
+            # The router stores the matched route in the scope; unmatched paths
+            # share one label so stray URLs cannot blow up the series count.
+            route = scope.get("route")
+            request_metrics.observe(
+                method,
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started,
+            )
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_MULTIPROC_DIR, f"worker-{pid}.json")
+
+
+def write_snapshot(snapshot: dict) -> None:
+    path = _snapshot_path(snapshot["pid"])
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot, f)
+    os.replace(path + ".tmp", path)
+
+
+async def flush_periodically() -> None:
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    while True:
+        # Snapshot on the loop that records the tables; write off it.
+        await asyncio.to_thread(write_snapshot, request_metrics.snapshot())
+        await asyncio.sleep(METRICS_FLUSH_INTERVAL)
+
+
+_flush_task: Optional[asyncio.Task] = None
+
+
+def start_flushing() -> None:
+    """Begin writing this worker's snapshot when multi-process mode is on."""
+    global _flush_task
+    if METRICS_MULTIPROC_DIR and _flush_task is None:
+        _flush_task = asyncio.get_running_loop().create_task(flush_periodically())
+
+
+def _load_snapshots(own: dict) -> List[dict]:
+    if not METRICS_MULTIPROC_DIR:
+        return [own]
+
+    write_snapshot(own)
+    snapshots = []
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(METRICS_MULTIPROC_DIR, name)
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+            snapshot["live"] = (
+                time.time() - os.path.getmtime(path) < 3 * METRICS_FLUSH_INTERVAL
+            )
+        except (OSError, ValueError):
+            continue
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _labels(**labels) -> str:
+    pairs = ",".join(
+        f'{name}="{str(value)}"' for name, value in labels.items() if value is not None
+    )
+    return "{" + pairs + "}" if pairs else ""
+
+
+def render_metrics(own: dict) -> str:
+    """Merge the worker snapshots into the Prometheus text format.
+
+    ``own`` is this worker's ``request_metrics.snapshot()``, taken on the event
+    loop; the rest is file I/O and formatting, safe to run on a thread.
+
+    Request counters and histograms of exited workers are kept so totals never
+    go backwards; per-process gauges are reported only for live workers, with a
+    ``pid`` label in multi-process mode.
+    """
+    snapshots = _load_snapshots(own)
+    multiprocess = METRICS_MULTIPROC_DIR is not None
+    lines = []
+
+    merged: Dict[tuple, List[float]] = {}
+    for snapshot in snapshots:
+        for method, route, status, values in snapshot["series"]:
+            total = merged.setdefault((method, route, status), [0] * len(values))
+            for i, value in enumerate(values):
+                total[i] += value
+
+    lines += [
+        "# HELP http_requests_total HTTP requests by route template and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), values in sorted(merged.items()):
+        labels = _labels(method=method, route=route, status=status)
+        lines.append(f"http_requests_total{labels} {values[0]}")
+
+    lines += [
+        "# HELP http_request_duration_seconds HTTP request latency.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route, status), values in sorted(merged.items()):
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), values[2:]):
+            cumulative += count
+            labels = _labels(method=method, route=route, status=status, le=bound)
+            lines.append(f"http_request_duration_seconds_bucket{labels} {cumulative}")
+        labels = _labels(method=method, route=route, status=status)
+        lines.append(f"http_request_duration_seconds_sum{labels} {values[1]}")
+        lines.append(f"http_request_duration_seconds_count{labels} {values[0]}")
+
+    live = [s for s in snapshots if s.get("live", True)]
+
+    def family(name: str, help_text: str, samples: Iterable[tuple], kind="gauge"):
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def per_worker(snapshot: dict, **labels) -> dict:
+        return {**labels, "pid": snapshot["pid"] if multiprocess else None}
+
+    family(
+        "http_requests_in_flight",
+        "Requests currently being served.",
+        (
+            (per_worker(s, method=method), count)
+            for s in live
+            for method, count in sorted(s["in_flight"].items())
+        ),
+    )
+
+    pool_metrics = (
+        ("db_pool_size", "size", "Persistent connections in the pool.", "gauge"),
+        ("db_pool_checked_out", "checked_out", "Connections in use.", "gauge"),
+        ("db_pool_idle", "idle", "Idle connections in the pool.", "gauge"),
+        ("db_pool_overflow", "overflow", "Overflow connections open.", "gauge"),
+        ("db_pool_checkouts_total", "checkouts", "Pool checkouts.", "counter"),
+        ("db_pool_timeouts_total", "timeouts", "Pool checkout timeouts.", "counter"),
+        ("db_pool_max_wait_seconds", "max_wait_ms", "Longest checkout wait.", "gauge"),
+    )
+    for name, field, help_text, kind in pool_metrics:
+        scale = 0.001 if field.endswith("_ms") else 1
+        family(
+            name,
+            help_text,
+            (
+                (per_worker(s, engine=engine), stats[field] * scale)
+                for s in live
+                for engine, stats in sorted(s["pool"].items())
+            ),
+            kind,
+        )
+
+    cache_metrics = (
+        ("cache_entries", "size", "Entries currently cached.", "gauge"),
+        ("cache_hits_total", "hits", "Cache hits.", "counter"),
+        ("cache_misses_total", "misses", "Cache misses.", "counter"),
+        ("cache_evictions_total", "evictions", "LRU evictions.", "counter"),
+        ("cache_invalidations_total", "invalidations", "Invalidations.", "counter"),
+    )
+    for name, field, help_text, kind in cache_metrics:
+        family(
+            name,
+            help_text,
+            (
+                (per_worker(s, cache=cache), stats[field])
+                for s in live
+                for cache, stats in sorted(s["cache"].items())
+            ),
+            kind,
+        )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,4 @@
+-- Composite index backing keyset pagination of GET /sales/ (ORDER BY sale_date DESC, id DESC).
+-- It also serves every query that used idx_sales_date, which is dropped afterwards.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_date_id ON sales (sale_date, id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_sales_date;
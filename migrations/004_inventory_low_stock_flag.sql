@@ -0,0 +1,7 @@
+-- Stored low-stock flag so GET /inventory/low-stock and the low_stock_only filters
+-- can read a partial index instead of comparing two columns on every row.
+-- Adding a stored generated column rewrites the inventory table under an exclusive lock.
+ALTER TABLE inventory
+    ADD COLUMN IF NOT EXISTS is_low_stock boolean NOT NULL
+    GENERATED ALWAYS AS (coalesce(quantity <= low_stock_threshold, false)) STORED;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_low_stock ON inventory (id) WHERE is_low_stock;
@@ -0,0 +1,70 @@
+-- Monthly range partitioning of sales on sale_date, so date-bounded analytics and
+-- listing queries only touch the months they ask for and old months can be
+-- detached or dropped instead of deleted row by row (see manage_partitions.py).
+-- The table is rebuilt: writes to sales are blocked until the transaction commits.
+-- The primary key becomes (id, sale_date) because Postgres requires the
+-- partition key in every unique constraint; ids keep coming from sales_id_seq.
+BEGIN;
+
+ALTER TABLE sales RENAME TO sales_unpartitioned;
+ALTER TABLE sales_unpartitioned RENAME CONSTRAINT sales_pkey TO sales_unpartitioned_pkey;
+DROP INDEX idx_sales_date_id, idx_sales_product_date, idx_sales_platform,
+    ix_sales_id, ix_sales_order_id;
+
+CREATE TABLE sales (
+    id integer NOT NULL DEFAULT nextval('sales_id_seq'),
+    product_id integer NOT NULL REFERENCES products (id),
+    quantity integer NOT NULL,
+    unit_price numeric(10, 2) NOT NULL,
+    total_amount numeric(10, 2) NOT NULL,
+    customer_email varchar(100),
+    platform varchar(50),
+    order_id varchar(100),
+    sale_date timestamptz NOT NULL DEFAULT now(),
+    created_at timestamptz DEFAULT now(),
+    PRIMARY KEY (id, sale_date)
+) PARTITION BY RANGE (sale_date);
+
+CREATE TABLE sales_default PARTITION OF sales DEFAULT;
+
+-- One partition per UTC month from the oldest sale to three months ahead.
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(
+                (SELECT min(sale_date) FROM sales_unpartitioned), now()
+            ) AT TIME ZONE 'UTC'),
+            date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF sales FOR VALUES FROM (%L) TO (%L)',
+            'sales_y' || to_char(month, 'YYYY"m"MM'),
+            month || ' 00:00:00+00',
+            (month + interval '1 month')::date || ' 00:00:00+00'
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO sales (id, product_id, quantity, unit_price, total_amount, customer_email,
+                   platform, order_id, sale_date, created_at)
+SELECT id, product_id, quantity, unit_price, total_amount, customer_email,
+       platform, order_id, coalesce(sale_date, created_at, now()), created_at
+FROM sales_unpartitioned;
+
+ALTER SEQUENCE sales_id_seq OWNED BY sales.id;
+DROP TABLE sales_unpartitioned;
+
+CREATE INDEX idx_sales_date_id ON sales (sale_date, id);
+CREATE INDEX idx_sales_product_date ON sales (product_id, sale_date);
+CREATE INDEX idx_sales_platform ON sales (platform);
+CREATE INDEX ix_sales_id ON sales (id);
+CREATE INDEX ix_sales_order_id ON sales (order_id);
+
+COMMIT;
+
+ANALYZE sales;
@@ -0,0 +1,15 @@
+-- Snapshots written by compact_inventory_logs.py, and an (inventory_id, created_at)
+-- index so GET /inventory/{id}/history finds the newest log entry before a moment
+-- with one index probe. It replaces the inventory_id-only index.
+CREATE TABLE IF NOT EXISTS inventory_snapshots (
+    inventory_id integer NOT NULL REFERENCES inventory (id),
+    taken_at timestamptz NOT NULL,
+    quantity integer NOT NULL,
+    archived_logs integer NOT NULL DEFAULT 0,
+    units_in integer NOT NULL DEFAULT 0,
+    units_out integer NOT NULL DEFAULT 0,
+    PRIMARY KEY (inventory_id, taken_at)
+);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_logs_inventory_date
+    ON inventory_logs (inventory_id, created_at);
+DROP INDEX CONCURRENTLY IF EXISTS idx_inventory_logs_inventory;
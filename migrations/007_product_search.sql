@@ -0,0 +1,11 @@
+-- Full-text document behind GET /products/search. The SKU is stored as a single
+-- lexeme so prefix searches such as GEN-0001 are not split at the hyphen.
+-- Adding a stored generated column rewrites the products table under an exclusive lock.
+ALTER TABLE products
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(array_to_tsvector(ARRAY[lower(sku)]), 'A') ||
+        setweight(to_tsvector('simple', coalesce(name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+    ) STORED;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_products_search ON products USING gin (search_vector);
@@ -0,0 +1,7 @@
+-- Lets a compaction rerun tell whether late-arriving log entries are newer than
+-- the ones a snapshot was built from. Compaction works on whole UTC days, so an
+-- existing snapshot already saw every entry of its day that existed at the time;
+-- it is backfilled as covering the full day and keeps its quantity.
+ALTER TABLE inventory_snapshots ADD COLUMN IF NOT EXISTS as_of timestamptz;
+UPDATE inventory_snapshots SET as_of = taken_at WHERE as_of IS NULL;
+ALTER TABLE inventory_snapshots ALTER COLUMN as_of SET NOT NULL;
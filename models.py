@@ -1,8 +1,10 @@
+from sqlalchemy import DDL
 from sqlalchemy import DECIMAL as Decimal
-from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Index, Integer,
-                        String, Text)
+from sqlalchemy import (Boolean, Column, Computed, Date, DateTime, ForeignKey,
+                        Index, Integer, String, Text, event, text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 Base = declarative_base()
@@ -33,6 +35,19 @@ class Product(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Full-text document for /products/search. The SKU is one lexeme, so SKU
+    # prefixes match without the parser splitting them at hyphens.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(array_to_tsvector(ARRAY[lower(sku)]), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(name, '')), 'B') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'D')",
+                persisted=True,
+            ),
+        )
+    )
 
     category = relationship("Category", back_populates="products")
     inventory = relationship("Inventory", back_populates="product", uselist=False)
@@ -41,6 +56,7 @@ class Product(Base):
     __table_args__ = (
         Index("idx_product_category_active", "category_id", "is_active"),
         Index("idx_product_price", "price"),
+        Index("idx_products_search", "search_vector", postgresql_using="gin"),
     )
 
 
@@ -54,13 +70,20 @@ class Inventory(Base):
     last_updated = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # Stored so low-stock lookups can use the partial index below instead of
+    # comparing two columns on every row.
+    is_low_stock = Column(
+        Boolean,
+        Computed("coalesce(quantity <= low_stock_threshold, false)", persisted=True),
+        nullable=False,
+    )
 
     product = relationship("Product", back_populates="inventory")
     inventory_logs = relationship("InventoryLog", back_populates="inventory")
 
-    @property
-    def is_low_stock(self) -> bool:
-        return self.quantity <= self.low_stock_threshold
+    __table_args__ = (
+        Index("idx_inventory_low_stock", "id", postgresql_where=text("is_low_stock")),
+    )
 
 
 class InventoryLog(Base):
@@ -81,14 +104,41 @@ class InventoryLog(Base):
 
     __table_args__ = (
         Index("idx_inventory_logs_date", "created_at"),
-        Index("idx_inventory_logs_inventory", "inventory_id"),
+        Index("idx_inventory_logs_inventory_date", "inventory_id", "created_at"),
     )
 
 
+class InventorySnapshot(Base):
+    """Closing stock of one inventory row for a UTC day, taken at its end.
+
+    Written by log compaction: the quantity reflects every log entry created
+    before ``taken_at``, and that day's entries it replaced are summarized by
+    count and units added and removed.
+    """
+
+    __tablename__ = "inventory_snapshots"
+
+    inventory_id = Column(Integer, ForeignKey("inventory.id"), primary_key=True)
+    taken_at = Column(DateTime(timezone=True), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    # created_at of the newest log entry folded into ``quantity``
+    as_of = Column(DateTime(timezone=True), nullable=False)
+    archived_logs = Column(Integer, nullable=False, default=0)
+    units_in = Column(Integer, nullable=False, default=0)
+    units_out = Column(Integer, nullable=False, default=0)
+
+
 class Sale(Base):
+    """A single sale, stored in monthly range partitions on ``sale_date``.
+
+    Postgres requires the partition key in the primary key, hence ``(id,
+    sale_date)``; ``id`` still comes from one sequence and stays unique.
+    See ``services/partition_service.py`` for partition management.
+    """
+
     __tablename__ = "sales"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Decimal(10, 2), nullable=False)
@@ -96,13 +146,40 @@ class Sale(Base):
     customer_email = Column(String(100))
     platform = Column(String(50))
     order_id = Column(String(100), index=True)
-    sale_date = Column(DateTime(timezone=True), server_default=func.now())
+    sale_date = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     product = relationship("Product", back_populates="sales")
 
     __table_args__ = (
-        Index("idx_sales_date", "sale_date"),
+        Index("idx_sales_date_id", "sale_date", "id"),
         Index("idx_sales_product_date", "product_id", "sale_date"),
         Index("idx_sales_platform", "platform"),
+        {"postgresql_partition_by": "RANGE (sale_date)"},
     )
+
+
+# Catches sales outside every monthly partition so writes never fail on a
+# missing month; PartitionService moves them out when their month is created.
+event.listen(
+    Sale.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS sales_default PARTITION OF sales DEFAULT"),
+)
+
+
+class SalesDailyRollup(Base):
+    """Per-day sales totals, maintained alongside every write to ``sales``."""
+
+    __tablename__ = "sales_daily_rollup"
+
+    sale_day = Column(Date, primary_key=True)  # UTC calendar day
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    platform = Column(String(50), primary_key=True, default="")  # '' when unset
+    total_revenue = Column(Decimal(14, 2), nullable=False, default=0)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity_sold = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("idx_sales_rollup_product_day", "product_id", "sale_day"),)
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row on a page into an opaque token."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(
+    cursor: Optional[str], skip: int = 0, types: Sequence[type] = (int,)
+) -> Optional[List[Any]]:
+    """Unpack a cursor token, rejecting it when mixed with offset paging."""
+    if cursor is None:
+        return None
+    if skip:
+        raise HTTPException(
+            status_code=400, detail="Use either skip or cursor, not both"
+        )
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor shape mismatch")
+        return [
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for value, type_ in zip(values, types)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(
+    response: Response, items: Sequence[Any], limit: int, key: Callable[[Any], tuple]
+) -> None:
+    """Advertise the cursor for the following page when this page is full."""
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
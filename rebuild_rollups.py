@@ -0,0 +1,13 @@
+if __name__ == "__main__":
+    print("Rebuilding daily sales rollup from raw sales...")
+
+    from database import SessionLocal
+    from services.rollup_service import RollupService
+
+    db = SessionLocal()
+    try:
+        rows = RollupService(db).rebuild()
+    finally:
+        db.close()
+
+    print(f"Rollup rebuild completed! {rows} rows written.")
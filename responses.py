@@ -0,0 +1,38 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from instrumentation import measure_serialize
+
+
+def _default(value: Any) -> Any:
+    # Decimals are rendered as strings, as Pydantic does for the response models.
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class TimedJSONResponse(JSONResponse):
+    """The default JSON response, with rendering reported in Server-Timing."""
+
+    def render(self, content: Any) -> bytes:
+        with measure_serialize():
+            return super().render(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson straight from plain dicts.
+
+    Routes that return it skip per-row Pydantic model creation and response
+    validation, so the payload must already match the declared response model.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with measure_serialize():
+            return orjson.dumps(
+                content,
+                default=_default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
@@ -1,11 +1,15 @@
-from typing import List
+from bisect import bisect_right
+from operator import attrgetter
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from database import get_db
 from models import Category
+from pagination import decode_cursor, set_next_cursor
 from schemas import CategoryCreate, CategoryResponse
+from services.catalog_cache import catalog_cache
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
@@ -16,7 +20,9 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     db_category = Category(**category.dict())
     db.add(db_category)
     try:
+        catalog_cache.notify(db, "category")
         db.commit()
+        catalog_cache.invalidate("category")
         db.refresh(db_category)
         return db_category
     except Exception as e:
@@ -25,7 +31,24 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[CategoryResponse])
-def get_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all categories with pagination."""
-    categories = db.query(Category).offset(skip).limit(limit).all()
-    return categories
+def get_categories(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Get all categories with offset or cursor pagination.
+
+    Served from the catalog cache; the whole table is kept in memory. Cache
+    misses load from the primary, so a lagging replica cannot refill the
+    cache with a list from before the latest invalidation.
+    """
+    after = decode_cursor(cursor, skip)
+
+    categories = catalog_cache.list_categories(db)
+    start = bisect_right(categories, after[0], key=attrgetter("id")) if after else 0
+
+    page = categories[start + skip : start + skip + limit]
+    set_next_cursor(response, page, limit, key=lambda c: (c.id,))
+    return [category._asdict() for category in page]
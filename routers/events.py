@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from services.live_events import live_events
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.get("/")
+async def stream_events(request: Request):
+    """Server-Sent Events stream of new sales, today's totals and low-stock changes.
+
+    Events: ``totals`` on connect and on every refresh, ``sale`` and
+    ``sales_batch`` with the updated totals, ``low_stock`` when an inventory
+    row crosses its threshold in either direction, and ``dropped`` before the
+    stream is closed for a client that fell too far behind.
+    """
+    return StreamingResponse(
+        live_events.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
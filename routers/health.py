@@ -2,6 +2,12 @@ from datetime import datetime
 
 from fastapi import APIRouter
 
+from database import get_pool_status
+from services.analytics_cache import analytics_cache
+from services.catalog_cache import catalog_cache
+from services.live_events import live_events
+from services.sale_queue import sale_queue
+
 router = APIRouter(tags=["Health"])
 
 
@@ -9,3 +15,27 @@ router = APIRouter(tags=["Health"])
 def health_check():
     """API health check endpoint."""
     return {"status": "healthy", "timestamp": datetime.utcnow()}
+
+
+@router.get("/health/pool")
+def pool_status():
+    """Connection pool usage: checked-out, idle and overflow counts plus wait times."""
+    return get_pool_status()
+
+
+@router.get("/health/cache")
+def cache_status():
+    """Analytics and catalog cache sizes, hit/miss counters and evictions."""
+    return {"analytics": analytics_cache.stats(), "catalog": catalog_cache.stats()}
+
+
+@router.get("/health/events")
+def events_status():
+    """Live event stream subscribers, published events and dropped clients."""
+    return live_events.stats()
+
+
+@router.get("/health/sales-queue")
+def sales_queue_status():
+    """Write-behind sale queue depth, group commits and rejected sales."""
+    return sale_queue.stats()
@@ -1,64 +1,135 @@
+import logging
+from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from database import get_db
-from models import Inventory, Product
-from schemas import InventoryResponse, InventoryUpdate
+from database import get_async_db, get_async_read_db
+from models import Category, Inventory, Product
+from pagination import decode_cursor, set_next_cursor
+from responses import FastJSONResponse
+from schemas import (InventoryBatchResponse, InventoryBatchUpdate,
+                     InventoryHistory, InventoryResponse, InventoryUpdate)
+from serializers import (CATEGORY_COLUMNS, INVENTORY_COLUMNS, PRODUCT_COLUMNS,
+                         inventory_row)
+from services.inventory_history_service import InventoryHistoryService
 from services.inventory_service import InventoryService
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
+logger = logging.getLogger("ecommerce.inventory")
+
+MAX_INVENTORY_BATCH = 10000
+
 
 @router.get("/", response_model=List[InventoryResponse])
-def get_inventory(
+async def get_inventory(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None),
     low_stock_only: Optional[bool] = Query(False),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Get inventory status with filtering options."""
-    query = db.query(Inventory).options(
-        joinedload(Inventory.product).joinedload(Product.category)
+    after = decode_cursor(cursor, skip)
+
+    query = (
+        select(*INVENTORY_COLUMNS, *PRODUCT_COLUMNS, *CATEGORY_COLUMNS)
+        .join(Product, Product.id == Inventory.product_id)
+        .join(Category, Category.id == Product.category_id)
     )
 
     if low_stock_only:
-        query = query.filter(Inventory.quantity <= Inventory.low_stock_threshold)
+        query = query.filter(Inventory.is_low_stock == True)
+
+    if after:
+        query = query.filter(Inventory.id > after[0])
+
+    rows = (
+        await db.execute(query.order_by(Inventory.id).offset(skip).limit(limit))
+    ).all()
+
+    response = FastJSONResponse([inventory_row(row) for row in rows])
+    set_next_cursor(response, rows, limit, key=lambda row: (row.inventory_id,))
+    return response
 
-    inventory_items = query.offset(skip).limit(limit).all()
-    return inventory_items
+
+def _update_inventory(db: Session, inventory_id: int, update_data: InventoryUpdate):
+    InventoryService(db).update_inventory(inventory_id, update_data)
+    return db.execute(
+        select(*INVENTORY_COLUMNS, *PRODUCT_COLUMNS, *CATEGORY_COLUMNS)
+        .join(Product, Product.id == Inventory.product_id)
+        .join(Category, Category.id == Product.category_id)
+        .where(Inventory.id == inventory_id)
+    ).one()
 
 
 @router.put("/{inventory_id}", response_model=InventoryResponse)
-def update_inventory(
-    inventory_id: int, update_data: InventoryUpdate, db: Session = Depends(get_db)
+async def update_inventory(
+    inventory_id: int,
+    update_data: InventoryUpdate,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update inventory levels with logging."""
-    inventory_service = InventoryService(db)
-
     try:
-        updated_inventory = inventory_service.update_inventory(
-            inventory_id, update_data
+        row = await db.run_sync(_update_inventory, inventory_id, update_data)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception:
+        await db.rollback()
+        logger.exception("Inventory update of %d failed", inventory_id)
+        raise HTTPException(status_code=400, detail="Failed to update inventory")
+    return FastJSONResponse(inventory_row(row))
+
+
+@router.post("/batch", response_model=InventoryBatchResponse)
+async def update_inventory_batch(
+    updates: List[InventoryBatchUpdate], db: AsyncSession = Depends(get_async_db)
+):
+    """Apply many stock updates, addressed by inventory id or SKU, at once."""
+    if not updates:
+        raise HTTPException(status_code=400, detail="No updates provided")
+    if len(updates) > MAX_INVENTORY_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_INVENTORY_BATCH} updates per batch",
         )
 
-        inventory_with_product = (
-            db.query(Inventory)
-            .options(joinedload(Inventory.product).joinedload(Product.category))
-            .filter(Inventory.id == inventory_id)
-            .first()
+    try:
+        return await db.run_sync(
+            lambda session: InventoryService(session).update_inventory_batch(updates)
         )
+    except Exception:
+        await db.rollback()
+        logger.exception("Inventory batch of %d updates failed", len(updates))
+        raise HTTPException(status_code=400, detail="Failed to update inventory")
+
 
-        return inventory_with_product
+@router.get("/{inventory_id}/history", response_model=InventoryHistory)
+async def get_inventory_history(
+    inventory_id: int,
+    at: datetime = Query(..., description="Point in time to reconstruct"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Stock level of an inventory row at a past moment.
+
+    Read from the newest log entry or compaction snapshot at or before ``at``.
+    """
+    try:
+        return await db.run_sync(
+            lambda session: InventoryHistoryService(session).stock_at(inventory_id, at)
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail="Failed to update inventory")
 
 
 @router.get("/low-stock", response_model=List[InventoryResponse])
-def get_low_stock_alerts(db: Session = Depends(get_db)):
+async def get_low_stock_alerts(db: AsyncSession = Depends(get_async_read_db)):
     """Get all products with low stock levels."""
-    inventory_service = InventoryService(db)
-    low_stock_items = inventory_service.get_low_stock_items()
-    return low_stock_items
+    rows = await db.run_sync(
+        lambda session: InventoryService(session).get_low_stock_items()
+    )
+    return FastJSONResponse([inventory_row(row) for row in rows])
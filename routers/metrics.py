@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+from fastapi.concurrency import run_in_threadpool
+
+from metrics import CONTENT_TYPE, render_metrics, request_metrics
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, connection pool and cache metrics for Prometheus to scrape."""
+    # The snapshot is taken on the event loop thread that records the metrics;
+    # merging other workers' snapshot files is blocking I/O, so it runs off it.
+    snapshot = request_metrics.snapshot()
+    content = await run_in_threadpool(render_metrics, snapshot)
+    return Response(content=content, media_type=CONTENT_TYPE)
@@ -1,19 +1,37 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
-from database import get_db
+from database import get_db, get_read_db
 from models import Category, Inventory, Product
-from schemas import ProductCreate, ProductResponse, ProductUpdate
+from pagination import decode_cursor, set_next_cursor
+from responses import FastJSONResponse
+from schemas import (ProductCreate, ProductImportResponse, ProductResponse,
+                     ProductUpdate)
+from serializers import (CATEGORY_COLUMNS, PRODUCT_COLUMNS, STOCK_COLUMNS,
+                         product_row)
+from services.catalog_cache import catalog_cache
+from services.product_service import (IMPORT_CHUNK_SIZE, ImportReport,
+                                      ProductService, read_import_records)
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+MAX_SEARCH_RESULTS = 100
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
 
 @router.post("/", response_model=ProductResponse)
 def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     """Create a new product with initial inventory."""
-    category = db.query(Category).filter(Category.id == product.category_id).first()
+    category = catalog_cache.get_category(db, product.category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
@@ -61,18 +79,68 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="SKU already exists")
 
 
+@router.post("/import", response_model=ProductImportResponse)
+async def import_products(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", regex="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """Create or replace products by SKU from a CSV or NDJSON request body.
+
+    The body is parsed as it is received and written in chunks of
+    ``IMPORT_CHUNK_SIZE`` rows, each in its own transaction, so memory use
+    does not grow with the file. Rows that fail are reported and skipped.
+    """
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = IMPORT_CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=",
+        )
+
+    product_service = ProductService(db)
+    report = ImportReport()
+    chunk = []
+    try:
+        async for row, record, error in read_import_records(request.stream(), fmt):
+            if error:
+                report.fail(row, None, error)
+                continue
+            chunk.append((row, record))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await run_in_threadpool(product_service.import_chunk, chunk, report)
+                chunk = []
+        if chunk:
+            await run_in_threadpool(product_service.import_chunk, chunk, report)
+    except ValueError as e:
+        # Chunks before the unreadable part have been committed.
+        raise HTTPException(
+            status_code=400,
+            detail=f"{e}; stopped after {report.created} created and "
+            f"{report.updated} updated",
+        )
+    return report.response()
+
+
 @router.get("/", response_model=List[ProductResponse])
 def get_products(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None),
     category_id: Optional[int] = Query(None),
     is_active: Optional[bool] = Query(None),
     low_stock_only: Optional[bool] = Query(False),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get products with filtering options."""
-    query = db.query(Product).options(
-        joinedload(Product.category), joinedload(Product.inventory)
+    after = decode_cursor(cursor, skip)
+
+    query = (
+        select(*PRODUCT_COLUMNS, *CATEGORY_COLUMNS, *STOCK_COLUMNS)
+        .join(Category, Category.id == Product.category_id)
+        .outerjoin(Inventory, Inventory.product_id == Product.id)
     )
 
     if category_id:
@@ -82,24 +150,36 @@ def get_products(
         query = query.filter(Product.is_active == is_active)
 
     if low_stock_only:
-        query = query.join(Inventory).filter(
-            Inventory.quantity <= Inventory.low_stock_threshold
-        )
+        query = query.filter(Inventory.is_low_stock == True)
 
-    products = query.offset(skip).limit(limit).all()
+    if after:
+        query = query.filter(Product.id > after[0])
+
+    rows = db.execute(query.order_by(Product.id).offset(skip).limit(limit)).all()
+
+    response = FastJSONResponse([product_row(row, with_stock=True) for row in rows])
+    set_next_cursor(response, rows, limit, key=lambda row: (row.product_id,))
+    return response
 
-    response_products = []
-    for product in products:
-        response_data = ProductResponse.model_validate(product)
-        response_data.current_stock = (
-            product.inventory.quantity if product.inventory else 0
-        )
-        response_data.is_low_stock = (
-            product.inventory.is_low_stock if product.inventory else False
-        )
-        response_products.append(response_data)
 
-    return response_products
+@router.get("/search", response_model=List[ProductResponse])
+def search_products(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS),
+    category_id: Optional[int] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    """Ranked search over SKU, name and description; every term must match.
+
+    Each term matches as a prefix, so ``GEN-0001`` finds SKUs starting with it
+    and ``wire mou`` finds "Wireless Mouse".
+    """
+    try:
+        rows = ProductService(db).search(q, limit, category_id, is_active)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse([product_row(row, with_stock=True) for row in rows])
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
@@ -114,9 +194,7 @@ def update_product(
     update_data = product_update.dict(exclude_unset=True)
 
     if "category_id" in update_data:
-        category = (
-            db.query(Category).filter(Category.id == update_data["category_id"]).first()
-        )
+        category = catalog_cache.get_category(db, update_data["category_id"])
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
 
@@ -124,7 +202,9 @@ def update_product(
         setattr(db_product, field, value)
 
     try:
+        catalog_cache.notify(db, "product", product_id)
         db.commit()
+        catalog_cache.invalidate("product", product_id)
         db.refresh(db_product)
 
         product_with_relations = (
@@ -1,122 +1,431 @@
+import asyncio
+import csv
+import io
+import json
+import logging
 from datetime import datetime, timedelta
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from database import get_db
-from models import Inventory, Product, Sale
-from schemas import RevenueComparison, SaleCreate, SaleResponse, SalesAnalytics
+from database import ReadSessionLocal, get_async_read_db, get_db, get_read_db
+from models import Category, Product, Sale
+from pagination import decode_cursor, set_next_cursor
+from responses import FastJSONResponse
+from schemas import (RevenueComparison, SaleAccepted, SaleBatchResponse,
+                     SaleCreate, SaleResponse, SalesAnalytics, SalesTimeSeries,
+                     TimeSeriesInterval, TopSales, TopSalesDimension,
+                     TopSalesMetric)
+from serializers import (CATEGORY_COLUMNS, PRODUCT_COLUMNS, SALE_COLUMNS,
+                         sale_row)
+from services.analytics_cache import analytics_cache
+from services.cache import MISSING
+from services.catalog_cache import catalog_cache
+from services.sale_queue import SALE_WRITE_BEHIND, QueueFull, sale_queue
 from services.sales_service import SalesService
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 
+logger = logging.getLogger("ecommerce.sales")
 
-@router.post("/", response_model=SaleResponse)
-def create_sale(sale: SaleCreate, db: Session = Depends(get_db)):
-    """Record a new sale."""
-    product = db.query(Product).filter(Product.id == sale.product_id).first()
+MAX_SALE_BATCH = 50000
+MAX_TOP_SALES = 100
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = [
+    "id",
+    "sale_date",
+    "order_id",
+    "product_id",
+    "sku",
+    "product_name",
+    "quantity",
+    "unit_price",
+    "total_amount",
+    "platform",
+    "customer_email",
+]
+
+
+def _load_sale(db: Session, sale_id: int, sale_date: datetime) -> Sale:
+    return (
+        db.query(Sale)
+        .options(joinedload(Sale.product).joinedload(Product.category))
+        .filter(Sale.id == sale_id, Sale.sale_date == sale_date)
+        .first()
+    )
+
+
+def _queued_sale_product(db: Session, product_id: int):
+    try:
+        return catalog_cache.get_product(db, product_id)
+    finally:
+        # Give the connection back while the sale waits for its group commit.
+        db.close()
+
+
+def _record_sale(sale: SaleCreate, db: Session) -> Sale:
+    """Record one sale in its own transaction."""
+    product = catalog_cache.get_product(db, sale.product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    total_amount = sale.quantity * sale.unit_price
+    sales_service = SalesService(db)
+    try:
+        staged = sales_service.stage_sales(
+            [sale], reason=f"Sale {sale.order_id}" if sale.order_id else "Sale"
+        )
+        if staged.rows:
+            db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Sale %s failed", sale.model_dump_json())
+        raise HTTPException(status_code=400, detail="Failed to create sale")
 
-    sale_data = sale.dict()
-    if not sale_data.get("sale_date"):
-        sale_data["sale_date"] = datetime.utcnow()
+    result = staged.response.results[0]
+    if result.error:
+        raise HTTPException(status_code=404, detail=result.error)
+    # Committed: from here on nothing may turn into an error the client retries.
+    SalesService.announce_sales(staged)
+    return _load_sale(db, result.sale_id, staged.rows[0]["sale_date"])
 
-    db_sale = Sale(**sale_data, total_amount=total_amount)
-    db.add(db_sale)
 
-    inventory = (
-        db.query(Inventory).filter(Inventory.product_id == sale.product_id).first()
-    )
-    if inventory:
-        inventory.quantity = max(0, inventory.quantity - sale.quantity)
+@router.post(
+    "/",
+    response_model=SaleResponse,
+    responses={202: {"model": SaleAccepted}, 503: {"description": "Queue full"}},
+)
+async def create_sale(
+    sale: SaleCreate,
+    wait: bool = Query(
+        True, description="With write-behind on, wait for the durable commit"
+    ),
+    db: Session = Depends(get_db),
+):
+    """Record a new sale.
+
+    With ``SALE_WRITE_BEHIND`` on, the sale is queued and group-committed
+    with others. ``wait=false`` answers 202 as soon as it is queued; a full
+    queue answers 503 with ``Retry-After``.
+    """
+    if not SALE_WRITE_BEHIND:
+        return await run_in_threadpool(_record_sale, sale, db)
+
+    product = await run_in_threadpool(_queued_sale_product, db, sale.product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    if not sale.sale_date:
+        sale = sale.model_copy(update={"sale_date": datetime.utcnow()})
 
     try:
-        db.commit()
-        db.refresh(db_sale)
-
-        sale_with_product = (
-            db.query(Sale)
-            .options(joinedload(Sale.product).joinedload(Product.category))
-            .filter(Sale.id == db_sale.id)
-            .first()
+        future = sale_queue.submit(sale)
+    except QueueFull as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
         )
+    if not wait:
+        return FastJSONResponse(
+            {"status": "accepted", **sale.model_dump()}, status_code=202
+        )
+
+    try:
+        sale_id = await asyncio.wrap_future(future)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_in_threadpool(_load_sale, db, sale_id, sale.sale_date)
+
 
-        return sale_with_product
-    except Exception as e:
+@router.post("/batch", response_model=SaleBatchResponse)
+def create_sales_batch(sales: List[SaleCreate], db: Session = Depends(get_db)):
+    """Record many sales at once with per-item results."""
+    if not sales:
+        raise HTTPException(status_code=400, detail="No sales provided")
+    if len(sales) > MAX_SALE_BATCH:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_SALE_BATCH} sales per batch"
+        )
+
+    sales_service = SalesService(db)
+    try:
+        return sales_service.create_sales(sales)
+    except Exception:
         db.rollback()
-        raise HTTPException(status_code=400, detail="Failed to create sale")
+        logger.exception("Sales batch of %d sales failed", len(sales))
+        raise HTTPException(status_code=400, detail="Failed to create sales")
+
+
+def _filter_sales(query, start_date, end_date, product_id, platform):
+    """Apply the ``GET /sales/`` filters to a Query or select()."""
+    if start_date:
+        query = query.filter(Sale.sale_date >= start_date)
+    if end_date:
+        query = query.filter(Sale.sale_date <= end_date)
+    if product_id:
+        query = query.filter(Sale.product_id == product_id)
+    if platform:
+        query = query.filter(Sale.platform == platform)
+    return query
 
 
 @router.get("/", response_model=List[SaleResponse])
 def get_sales(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     product_id: Optional[int] = Query(None),
     platform: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Get sales with filtering options."""
-    query = db.query(Sale).options(
-        joinedload(Sale.product).joinedload(Product.category)
+    """Get sales with filtering options.
+
+    Pass the ``X-Next-Cursor`` header of a full page back as ``cursor`` to fetch
+    the next page without the cost of a large offset.
+    """
+    after = decode_cursor(cursor, skip, types=(datetime, int))
+
+    query = (
+        select(*SALE_COLUMNS, *PRODUCT_COLUMNS, *CATEGORY_COLUMNS)
+        .join(Product, Product.id == Sale.product_id)
+        .join(Category, Category.id == Product.category_id)
     )
+    query = _filter_sales(query, start_date, end_date, product_id, platform)
+
+    if after:
+        query = query.filter(tuple_(Sale.sale_date, Sale.id) < tuple_(*after))
+
+    rows = db.execute(
+        query.order_by(Sale.sale_date.desc(), Sale.id.desc()).offset(skip).limit(limit)
+    ).all()
+
+    response = FastJSONResponse([sale_row(row) for row in rows])
+    set_next_cursor(
+        response, rows, limit, key=lambda row: (row.sale_sale_date, row.sale_id)
+    )
+    return response
 
-    if start_date:
-        query = query.filter(Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(Sale.sale_date <= end_date)
-    if product_id:
-        query = query.filter(Sale.product_id == product_id)
-    if platform:
-        query = query.filter(Sale.platform == platform)
 
-    sales = query.order_by(Sale.sale_date.desc()).offset(skip).limit(limit).all()
-    return sales
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _stream_export(stmt, export_format: str):
+    # The session is owned by the generator, not the request dependency, so it
+    # stays open for exactly as long as rows are being streamed.
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(row._asdict(), default=_json_default) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_sales(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    product_id: Optional[int] = Query(None),
+    platform: Optional[str] = Query(None),
+):
+    """Stream every matching sale as CSV or NDJSON in constant memory."""
+    stmt = select(
+        Sale.id,
+        Sale.sale_date,
+        Sale.order_id,
+        Sale.product_id,
+        Product.sku,
+        Product.name.label("product_name"),
+        Sale.quantity,
+        Sale.unit_price,
+        Sale.total_amount,
+        Sale.platform,
+        Sale.customer_email,
+    ).join(Product, Product.id == Sale.product_id)
+    stmt = _filter_sales(stmt, start_date, end_date, product_id, platform)
+    stmt = stmt.order_by(Sale.sale_date.desc(), Sale.id.desc())
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_export(stmt, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sales.{format}"'},
+    )
+
+
+def _period_start(period: str, end_date: datetime) -> datetime:
+    """Start of the rolling ``period`` window that ends at ``end_date``."""
+    if period == "daily":
+        return end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "weekly":
+        return end_date - timedelta(days=7)
+    if period == "monthly":
+        return end_date - timedelta(days=30)
+    return end_date - timedelta(days=365)
 
 
 @router.get("/analytics", response_model=SalesAnalytics, tags=["Sales Analytics"])
-def get_sales_analytics(
+async def get_sales_analytics(
     period: str = Query(..., regex="^(daily|weekly|monthly|annual)$"),
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     product_id: Optional[int] = Query(None),
     category_id: Optional[int] = Query(None),
     platform: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Get sales analytics for specified period."""
-    if not start_date or not end_date:
+    rolling = not start_date or not end_date
+    if rolling:
         end_date = datetime.utcnow()
-        if period == "daily":
-            start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif period == "weekly":
-            start_date = end_date - timedelta(days=7)
-        elif period == "monthly":
-            start_date = end_date - timedelta(days=30)
-        else:
-            start_date = end_date - timedelta(days=365)
+        start_date = _period_start(period, end_date)
 
-    sales_service = SalesService(db)
-    return sales_service.get_sales_analytics(
-        start_date=start_date,
-        end_date=end_date,
+    cache_key = analytics_cache.key(
+        "analytics",
+        start_date,
+        end_date,
+        product_id=product_id,
+        category_id=category_id,
+        platform=platform,
+        rolling=rolling,
+    )
+    analytics = analytics_cache.get(cache_key)
+    if analytics is MISSING:
+        generation = analytics_cache.generation
+        analytics = await db.run_sync(
+            lambda session: SalesService(session).get_sales_analytics(
+                start_date=start_date,
+                end_date=end_date,
+                product_id=product_id,
+                category_id=category_id,
+                platform=platform,
+            )
+        )
+        analytics_cache.set(cache_key, analytics, generation)
+    return analytics
+
+
+@router.get("/top", response_model=TopSales, tags=["Sales Analytics"])
+async def get_top_sales(
+    dimension: TopSalesDimension = Query(TopSalesDimension.PRODUCT),
+    metric: TopSalesMetric = Query(TopSalesMetric.REVENUE),
+    limit: int = Query(10, ge=1, le=MAX_TOP_SALES),
+    period: str = Query("monthly", regex="^(daily|weekly|monthly|annual)$"),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    category_id: Optional[int] = Query(None),
+    platform: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Top products, categories or platforms by revenue or quantity, with shares."""
+    rolling = not start_date or not end_date
+    if rolling:
+        end_date = datetime.utcnow()
+        start_date = _period_start(period, end_date)
+
+    cache_key = analytics_cache.key(
+        f"top:{dimension.value}:{metric.value}:{limit}",
+        start_date,
+        end_date,
+        category_id=category_id,
+        platform=platform,
+        rolling=rolling,
+    )
+    top = analytics_cache.get(cache_key)
+    if top is MISSING:
+        generation = analytics_cache.generation
+        top = await db.run_sync(
+            lambda session: SalesService(session).get_top_sales(
+                start_date=start_date,
+                end_date=end_date,
+                dimension=dimension,
+                metric=metric,
+                limit=limit,
+                category_id=category_id,
+                platform=platform,
+            )
+        )
+        analytics_cache.set(cache_key, top, generation)
+    return top
+
+
+@router.get("/timeseries", response_model=SalesTimeSeries, tags=["Sales Analytics"])
+async def get_sales_timeseries(
+    interval: TimeSeriesInterval = Query(...),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    product_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+    platform: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Get zero-filled sales totals bucketed by hour, day, week or month."""
+    rolling = not start_date and not end_date
+    if not end_date:
+        end_date = datetime.utcnow()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+
+    cache_key = analytics_cache.key(
+        f"timeseries:{interval.value}",
+        start_date,
+        end_date,
         product_id=product_id,
         category_id=category_id,
         platform=platform,
+        rolling=rolling,
     )
+    timeseries = analytics_cache.get(cache_key)
+    if timeseries is not MISSING:
+        return timeseries
+
+    generation = analytics_cache.generation
+    try:
+        timeseries = await db.run_sync(
+            lambda session: SalesService(session).get_sales_timeseries(
+                start_date=start_date,
+                end_date=end_date,
+                interval=interval,
+                product_id=product_id,
+                category_id=category_id,
+                platform=platform,
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    analytics_cache.set(cache_key, timeseries, generation)
+    return timeseries
 
 
 @router.get(
     "/revenue-comparison", response_model=RevenueComparison, tags=["Sales Analytics"]
 )
-def get_revenue_comparison(
+async def get_revenue_comparison(
     period: str = Query(..., regex="^(daily|weekly|monthly|annual)$"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Compare revenue between current and previous periods."""
     end_date = datetime.utcnow()
@@ -138,10 +447,19 @@ def get_revenue_comparison(
         previous_start = current_start - timedelta(days=365)
         previous_end = current_start
 
-    sales_service = SalesService(db)
-    return sales_service.get_revenue_comparison(
-        current_start=current_start,
-        current_end=end_date,
-        previous_start=previous_start,
-        previous_end=previous_end,
+    cache_key = analytics_cache.key(
+        f"revenue-comparison:{period}", previous_start, end_date, rolling=True
     )
+    comparison = analytics_cache.get(cache_key)
+    if comparison is MISSING:
+        generation = analytics_cache.generation
+        comparison = await db.run_sync(
+            lambda session: SalesService(session).get_revenue_comparison(
+                current_start=current_start,
+                current_end=end_date,
+                previous_start=previous_start,
+                previous_end=previous_end,
+            )
+        )
+        analytics_cache.set(cache_key, comparison, generation)
+    return comparison
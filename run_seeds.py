@@ -1,8 +1,51 @@
+import argparse
+import os
+from datetime import date
+
+
+def parse_platforms(value: str) -> dict:
+    """Parse ``Amazon=0.6,Walmart=0.4`` into a platform weight mapping."""
+    platforms = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        platforms[name.strip()] = float(weight or 1)
+    return platforms
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the database")
+    parser.add_argument("--sales", type=int, help="Total sales (default: demo volume)")
+    parser.add_argument("--days", type=int, default=365, help="Days of sales history")
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument(
+        "--platforms",
+        type=parse_platforms,
+        default="Amazon=0.5,Walmart=0.5",
+        help="Platform mix as name=weight pairs",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        help="Day after the last day of history, exclusive (YYYY-MM-DD, default today)",
+    )
+    args = parser.parse_args()
+
     print("Seeding database with dummy data...")
 
     from seed_data import seed_database
 
-    seed_database()
+    counts = seed_database(
+        sales=args.sales,
+        days=args.days,
+        products=args.products,
+        platforms=args.platforms,
+        workers=args.workers,
+        seed=args.seed,
+        end_date=args.end_date,
+    )
 
     print("Database seeding completed!")
+    for table, rows in counts.items():
+        print(f"  {table}: {rows} rows")
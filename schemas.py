@@ -12,6 +12,24 @@ class ChangeType(str, Enum):
     ADJUSTMENT = "adjustment"
 
 
+class TimeSeriesInterval(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class TopSalesDimension(str, Enum):
+    PRODUCT = "product"
+    CATEGORY = "category"
+    PLATFORM = "platform"
+
+
+class TopSalesMetric(str, Enum):
+    REVENUE = "revenue"
+    QUANTITY = "quantity"
+
+
 class CategoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = None
@@ -64,12 +82,49 @@ class ProductResponse(ProductBase):
     is_low_stock: Optional[bool] = None
 
 
+class ProductImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    created: int
+    updated: int
+    # Rows skipped because a later row in the same chunk has the same SKU.
+    duplicates: int
+    failed: int
+    errors: List[ProductImportError]
+
+
 class InventoryUpdate(BaseModel):
     change_type: ChangeType
     quantity_change: int
     reason: Optional[str] = Field(None, max_length=200)
 
 
+class InventoryBatchUpdate(InventoryUpdate):
+    """An ``InventoryUpdate`` addressed by inventory id or product SKU."""
+
+    inventory_id: Optional[int] = None
+    sku: Optional[str] = Field(None, min_length=1, max_length=50)
+
+
+class InventoryBatchItemResult(BaseModel):
+    index: int
+    inventory_id: Optional[int] = None
+    previous_quantity: Optional[int] = None
+    new_quantity: Optional[int] = None
+    is_low_stock: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class InventoryBatchResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[InventoryBatchItemResult]
+
+
 class InventoryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -82,6 +137,14 @@ class InventoryResponse(BaseModel):
     product: ProductResponse
 
 
+class InventoryHistory(BaseModel):
+    inventory_id: int
+    at: datetime
+    quantity: int
+    source: str  # 'log', 'snapshot' or 'current'
+    recorded_at: Optional[datetime] = None
+
+
 class SaleCreate(BaseModel):
     product_id: int
     quantity: int = Field(..., gt=0)
@@ -92,6 +155,11 @@ class SaleCreate(BaseModel):
     sale_date: Optional[datetime] = None
 
 
+class SaleAccepted(SaleCreate):
+    status: str  # 'accepted': queued for the next group commit
+    sale_date: datetime
+
+
 class SaleResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -107,6 +175,18 @@ class SaleResponse(BaseModel):
     product: ProductResponse
 
 
+class SaleBatchItemResult(BaseModel):
+    index: int
+    sale_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SaleBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[SaleBatchItemResult]
+
+
 class SalesAnalytics(BaseModel):
     total_revenue: Decimal
     total_orders: int
@@ -121,3 +201,35 @@ class RevenueComparison(BaseModel):
     previous_period: SalesAnalytics
     growth_rate: float
     growth_amount: Decimal
+
+
+class SalesTimeSeriesPoint(BaseModel):
+    bucket_start: datetime
+    total_revenue: Decimal
+    total_orders: int
+    total_quantity_sold: int
+
+
+class SalesTimeSeries(BaseModel):
+    interval: TimeSeriesInterval
+    period_start: datetime
+    period_end: datetime
+    points: List[SalesTimeSeriesPoint]
+
+
+class TopSalesItem(BaseModel):
+    id: Optional[int] = None
+    name: Optional[str] = None
+    total_revenue: Decimal
+    total_orders: int
+    total_quantity_sold: int
+    share: float
+
+
+class TopSales(BaseModel):
+    dimension: TopSalesDimension
+    metric: TopSalesMetric
+    period_start: datetime
+    period_end: datetime
+    total: Decimal
+    items: List[TopSalesItem]
@@ -1,364 +1,540 @@
-def seed_database():
-    """Populate database with demo data for Amazon & Walmart products."""
-    import random
-    from datetime import datetime, timedelta
-    from decimal import Decimal
+"""Synthetic data generator for demos and capacity testing.
 
-    from database import SessionLocal
-    from models import Category, Inventory, Product, Sale
+Sales are generated in fixed-size chunks, each from its own seeded RNG, by a
+pool of worker processes that stream them into Postgres with COPY. The same
+``seed`` and ``end_date`` always produce the same rows, whatever the number
+of workers.
+"""
+import bisect
+import io
+import random
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Tuple
 
-    db = SessionLocal()
+from sqlalchemy import text
 
-    try:
-        from database import engine
-        from models import Base, Category, Inventory, Product, Sale
+from database import SessionLocal, engine
+from models import Base
+from services.partition_service import (SALES_PARTITIONS_AHEAD,
+                                        PartitionService, add_months)
+from services.rollup_service import RollupService
 
-        Base.metadata.create_all(bind=engine)
+SALES_CHUNK = 100_000
+DEFAULT_PLATFORMS = {"Amazon": 0.5, "Walmart": 0.5}
+CUSTOMER_EMAILS = [f"customer{n}@email.com" for n in range(1, 11)]
 
-        db.query(Sale).delete()
-        db.query(Inventory).delete()
-        db.query(Product).delete()
-        db.query(Category).delete()
-        db.commit()
+NAME_ADJECTIVES = [
+    "Classic",
+    "Compact",
+    "Deluxe",
+    "Eco",
+    "Essential",
+    "Heavy-Duty",
+    "Mini",
+    "Premium",
+    "Smart",
+    "Travel",
+    "Ultra",
+    "Vintage",
+]
+
+SALE_COLUMNS = (
+    "id, product_id, quantity, unit_price, total_amount, customer_email, "
+    "platform, order_id, sale_date"
+)
+
+CATEGORIES = [
+    {
+        "name": "Electronics",
+        "description": "Electronic devices and accessories",
+    },
+    {
+        "name": "Home & Garden",
+        "description": "Home improvement and garden supplies",
+    },
+    {
+        "name": "Clothing & Accessories",
+        "description": "Fashion and personal accessories",
+    },
+    {
+        "name": "Health & Beauty",
+        "description": "Health care and beauty products",
+    },
+    {
+        "name": "Sports & Outdoors",
+        "description": "Sports equipment and outdoor gear",
+    },
+    {
+        "name": "Books & Media",
+        "description": "Books, movies, and digital media",
+    },
+    {
+        "name": "Automotive",
+        "description": "Car parts and automotive accessories",
+    },
+    {"name": "Toys & Games", "description": "Children's toys and board games"},
+]
+
+
+DEMO_PRODUCTS = [
+    {
+        "name": "Wireless Bluetooth Headphones",
+        "sku": "WBH-001",
+        "price": Decimal("79.99"),
+        "cost": Decimal("35.00"),
+        "category": 0,
+    },
+    {
+        "name": "Smart Phone Charger Cable",
+        "sku": "SPC-002",
+        "price": Decimal("15.99"),
+        "cost": Decimal("4.50"),
+        "category": 0,
+    },
+    {
+        "name": "Portable Power Bank 10000mAh",
+        "sku": "PPB-003",
+        "price": Decimal("29.99"),
+        "cost": Decimal("12.00"),
+        "category": 0,
+    },
+    {
+        "name": "LED Desk Lamp with USB Port",
+        "sku": "LDL-004",
+        "price": Decimal("45.99"),
+        "cost": Decimal("18.00"),
+        "category": 0,
+    },
+    {
+        "name": "Wireless Mouse",
+        "sku": "WM-005",
+        "price": Decimal("24.99"),
+        "cost": Decimal("8.50"),
+        "category": 0,
+    },
+    {
+        "name": "Stainless Steel Kitchen Knife Set",
+        "sku": "KNS-006",
+        "price": Decimal("89.99"),
+        "cost": Decimal("35.00"),
+        "category": 1,
+    },
+    {
+        "name": "Indoor Plant Pot Set",
+        "sku": "IPS-007",
+        "price": Decimal("34.99"),
+        "cost": Decimal("12.00"),
+        "category": 1,
+    },
+    {
+        "name": "Memory Foam Pillow",
+        "sku": "MFP-008",
+        "price": Decimal("39.99"),
+        "cost": Decimal("15.00"),
+        "category": 1,
+    },
+    {
+        "name": "Garden Hose 50ft",
+        "sku": "GH-009",
+        "price": Decimal("49.99"),
+        "cost": Decimal("20.00"),
+        "category": 1,
+    },
+    {
+        "name": "Cotton T-Shirt Pack (3-Pack)",
+        "sku": "CTS-010",
+        "price": Decimal("24.99"),
+        "cost": Decimal("8.00"),
+        "category": 2,
+    },
+    {
+        "name": "Leather Wallet",
+        "sku": "LW-011",
+        "price": Decimal("59.99"),
+        "cost": Decimal("22.00"),
+        "category": 2,
+    },
+    {
+        "name": "Baseball Cap",
+        "sku": "BC-012",
+        "price": Decimal("19.99"),
+        "cost": Decimal("6.50"),
+        "category": 2,
+    },
+    {
+        "name": "Winter Gloves",
+        "sku": "WG-013",
+        "price": Decimal("16.99"),
+        "cost": Decimal("5.50"),
+        "category": 2,
+    },
+    {
+        "name": "Electric Toothbrush",
+        "sku": "ET-014",
+        "price": Decimal("69.99"),
+        "cost": Decimal("28.00"),
+        "category": 3,
+    },
+    {
+        "name": "Vitamin D3 Supplements",
+        "sku": "VD3-015",
+        "price": Decimal("19.99"),
+        "cost": Decimal("6.00"),
+        "category": 3,
+    },
+    {
+        "name": "Face Moisturizer SPF 30",
+        "sku": "FM-016",
+        "price": Decimal("32.99"),
+        "cost": Decimal("12.50"),
+        "category": 3,
+    },
+    {
+        "name": "Hair Styling Gel",
+        "sku": "HSG-017",
+        "price": Decimal("12.99"),
+        "cost": Decimal("4.00"),
+        "category": 3,
+    },
+    {
+        "name": "Yoga Mat Premium",
+        "sku": "YM-018",
+        "price": Decimal("44.99"),
+        "cost": Decimal("18.00"),
+        "category": 4,
+    },
+    {
+        "name": "Water Bottle Insulated 32oz",
+        "sku": "WB-019",
+        "price": Decimal("28.99"),
+        "cost": Decimal("10.00"),
+        "category": 4,
+    },
+    {
+        "name": "Resistance Bands Set",
+        "sku": "RBS-020",
+        "price": Decimal("19.99"),
+        "cost": Decimal("7.50"),
+        "category": 4,
+    },
+    {
+        "name": "Camping Flashlight LED",
+        "sku": "CFL-021",
+        "price": Decimal("22.99"),
+        "cost": Decimal("8.00"),
+        "category": 4,
+    },
+    {
+        "name": "Bestseller Novel Collection",
+        "sku": "BNC-022",
+        "price": Decimal("14.99"),
+        "cost": Decimal("4.50"),
+        "category": 5,
+    },
+    {
+        "name": "Educational Science Kit",
+        "sku": "ESK-023",
+        "price": Decimal("39.99"),
+        "cost": Decimal("16.00"),
+        "category": 5,
+    },
+    {
+        "name": "Puzzle 1000 Pieces",
+        "sku": "P1000-024",
+        "price": Decimal("18.99"),
+        "cost": Decimal("6.50"),
+        "category": 5,
+    },
+    {
+        "name": "Car Phone Mount",
+        "sku": "CPM-025",
+        "price": Decimal("21.99"),
+        "cost": Decimal("7.50"),
+        "category": 6,
+    },
+    {
+        "name": "Emergency Car Kit",
+        "sku": "ECK-026",
+        "price": Decimal("54.99"),
+        "cost": Decimal("22.00"),
+        "category": 6,
+    },
+    {
+        "name": "Car Air Freshener Pack",
+        "sku": "CAF-027",
+        "price": Decimal("8.99"),
+        "cost": Decimal("2.50"),
+        "category": 6,
+    },
+    {
+        "name": "Building Blocks Set 500pc",
+        "sku": "BBS-028",
+        "price": Decimal("49.99"),
+        "cost": Decimal("18.00"),
+        "category": 7,
+    },
+    {
+        "name": "Board Game Strategy",
+        "sku": "BGS-029",
+        "price": Decimal("34.99"),
+        "cost": Decimal("14.00"),
+        "category": 7,
+    },
+    {
+        "name": "Remote Control Car",
+        "sku": "RCC-030",
+        "price": Decimal("79.99"),
+        "cost": Decimal("32.00"),
+        "category": 7,
+    },
+]
+
+
+def _copy(cursor, table: str, columns: str, rows: io.StringIO) -> None:
+    rows.seek(0)
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", rows)
+
+
+def _cents(value: Decimal) -> int:
+    return int(value * 100)
+
+
+def _money(cents: int) -> str:
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+def _generated_name(product_id: int) -> str:
+    """A searchable, deterministic name such as ``Travel Wireless Mouse 1234``."""
+    adjective = NAME_ADJECTIVES[product_id % len(NAME_ADJECTIVES)]
+    base = DEMO_PRODUCTS[product_id // len(NAME_ADJECTIVES) % len(DEMO_PRODUCTS)]
+    return f"{adjective} {base['name']} {product_id}"
 
-        categories_data = [
-            {
-                "name": "Electronics",
-                "description": "Electronic devices and accessories",
-            },
-            {
-                "name": "Home & Garden",
-                "description": "Home improvement and garden supplies",
-            },
-            {
-                "name": "Clothing & Accessories",
-                "description": "Fashion and personal accessories",
-            },
-            {
-                "name": "Health & Beauty",
-                "description": "Health care and beauty products",
-            },
-            {
-                "name": "Sports & Outdoors",
-                "description": "Sports equipment and outdoor gear",
-            },
-            {
-                "name": "Books & Media",
-                "description": "Books, movies, and digital media",
-            },
-            {
-                "name": "Automotive",
-                "description": "Car parts and automotive accessories",
-            },
-            {"name": "Toys & Games", "description": "Children's toys and board games"},
-        ]
-
-        categories = []
-        for cat_data in categories_data:
-            category = Category(**cat_data)
-            db.add(category)
-            categories.append(category)
-
-        db.flush()
-
-        products_data = [
-            {
-                "name": "Wireless Bluetooth Headphones",
-                "sku": "WBH-001",
-                "price": Decimal("79.99"),
-                "cost": Decimal("35.00"),
-                "category_id": categories[0].id,
-            },
-            {
-                "name": "Smart Phone Charger Cable",
-                "sku": "SPC-002",
-                "price": Decimal("15.99"),
-                "cost": Decimal("4.50"),
-                "category_id": categories[0].id,
-            },
-            {
-                "name": "Portable Power Bank 10000mAh",
-                "sku": "PPB-003",
-                "price": Decimal("29.99"),
-                "cost": Decimal("12.00"),
-                "category_id": categories[0].id,
-            },
-            {
-                "name": "LED Desk Lamp with USB Port",
-                "sku": "LDL-004",
-                "price": Decimal("45.99"),
-                "cost": Decimal("18.00"),
-                "category_id": categories[0].id,
-            },
-            {
-                "name": "Wireless Mouse",
-                "sku": "WM-005",
-                "price": Decimal("24.99"),
-                "cost": Decimal("8.50"),
-                "category_id": categories[0].id,
-            },
-            {
-                "name": "Stainless Steel Kitchen Knife Set",
-                "sku": "KNS-006",
-                "price": Decimal("89.99"),
-                "cost": Decimal("35.00"),
-                "category_id": categories[1].id,
-            },
-            {
-                "name": "Indoor Plant Pot Set",
-                "sku": "IPS-007",
-                "price": Decimal("34.99"),
-                "cost": Decimal("12.00"),
-                "category_id": categories[1].id,
-            },
-            {
-                "name": "Memory Foam Pillow",
-                "sku": "MFP-008",
-                "price": Decimal("39.99"),
-                "cost": Decimal("15.00"),
-                "category_id": categories[1].id,
-            },
-            {
-                "name": "Garden Hose 50ft",
-                "sku": "GH-009",
-                "price": Decimal("49.99"),
-                "cost": Decimal("20.00"),
-                "category_id": categories[1].id,
-            },
-            {
-                "name": "Cotton T-Shirt Pack (3-Pack)",
-                "sku": "CTS-010",
-                "price": Decimal("24.99"),
-                "cost": Decimal("8.00"),
-                "category_id": categories[2].id,
-            },
-            {
-                "name": "Leather Wallet",
-                "sku": "LW-011",
-                "price": Decimal("59.99"),
-                "cost": Decimal("22.00"),
-                "category_id": categories[2].id,
-            },
-            {
-                "name": "Baseball Cap",
-                "sku": "BC-012",
-                "price": Decimal("19.99"),
-                "cost": Decimal("6.50"),
-                "category_id": categories[2].id,
-            },
-            {
-                "name": "Winter Gloves",
-                "sku": "WG-013",
-                "price": Decimal("16.99"),
-                "cost": Decimal("5.50"),
-                "category_id": categories[2].id,
-            },
-            {
-                "name": "Electric Toothbrush",
-                "sku": "ET-014",
-                "price": Decimal("69.99"),
-                "cost": Decimal("28.00"),
-                "category_id": categories[3].id,
-            },
-            {
-                "name": "Vitamin D3 Supplements",
-                "sku": "VD3-015",
-                "price": Decimal("19.99"),
-                "cost": Decimal("6.00"),
-                "category_id": categories[3].id,
-            },
-            {
-                "name": "Face Moisturizer SPF 30",
-                "sku": "FM-016",
-                "price": Decimal("32.99"),
-                "cost": Decimal("12.50"),
-                "category_id": categories[3].id,
-            },
-            {
-                "name": "Hair Styling Gel",
-                "sku": "HSG-017",
-                "price": Decimal("12.99"),
-                "cost": Decimal("4.00"),
-                "category_id": categories[3].id,
-            },
-            {
-                "name": "Yoga Mat Premium",
-                "sku": "YM-018",
-                "price": Decimal("44.99"),
-                "cost": Decimal("18.00"),
-                "category_id": categories[4].id,
-            },
-            {
-                "name": "Water Bottle Insulated 32oz",
-                "sku": "WB-019",
-                "price": Decimal("28.99"),
-                "cost": Decimal("10.00"),
-                "category_id": categories[4].id,
-            },
-            {
-                "name": "Resistance Bands Set",
-                "sku": "RBS-020",
-                "price": Decimal("19.99"),
-                "cost": Decimal("7.50"),
-                "category_id": categories[4].id,
-            },
-            {
-                "name": "Camping Flashlight LED",
-                "sku": "CFL-021",
-                "price": Decimal("22.99"),
-                "cost": Decimal("8.00"),
-                "category_id": categories[4].id,
-            },
-            {
-                "name": "Bestseller Novel Collection",
-                "sku": "BNC-022",
-                "price": Decimal("14.99"),
-                "cost": Decimal("4.50"),
-                "category_id": categories[5].id,
-            },
-            {
-                "name": "Educational Science Kit",
-                "sku": "ESK-023",
-                "price": Decimal("39.99"),
-                "cost": Decimal("16.00"),
-                "category_id": categories[5].id,
-            },
-            {
-                "name": "Puzzle 1000 Pieces",
-                "sku": "P1000-024",
-                "price": Decimal("18.99"),
-                "cost": Decimal("6.50"),
-                "category_id": categories[5].id,
-            },
-            {
-                "name": "Car Phone Mount",
-                "sku": "CPM-025",
-                "price": Decimal("21.99"),
-                "cost": Decimal("7.50"),
-                "category_id": categories[6].id,
-            },
-            {
-                "name": "Emergency Car Kit",
-                "sku": "ECK-026",
-                "price": Decimal("54.99"),
-                "cost": Decimal("22.00"),
-                "category_id": categories[6].id,
-            },
-            {
-                "name": "Car Air Freshener Pack",
-                "sku": "CAF-027",
-                "price": Decimal("8.99"),
-                "cost": Decimal("2.50"),
-                "category_id": categories[6].id,
-            },
-            {
-                "name": "Building Blocks Set 500pc",
-                "sku": "BBS-028",
-                "price": Decimal("49.99"),
-                "cost": Decimal("18.00"),
-                "category_id": categories[7].id,
-            },
-            {
-                "name": "Board Game Strategy",
-                "sku": "BGS-029",
-                "price": Decimal("34.99"),
-                "cost": Decimal("14.00"),
-                "category_id": categories[7].id,
-            },
-            {
-                "name": "Remote Control Car",
-                "sku": "RCC-030",
-                "price": Decimal("79.99"),
-                "cost": Decimal("32.00"),
-                "category_id": categories[7].id,
-            },
-        ]
-
-        products = []
-        for prod_data in products_data:
-            product = Product(**prod_data)
-            db.add(product)
-            products.append(product)
-
-        db.flush()
-
-        inventories = []
-        for product in products:
-            inventory = Inventory(
-                product_id=product.id,
-                quantity=random.randint(10, 500),
-                low_stock_threshold=random.randint(5, 25),
+
+def _build_catalog(rng: random.Random, products: int) -> List[Tuple]:
+    """Return ``(id, name, sku, price_cents, cost_cents, category_id)`` rows.
+
+    The hand-written demo products come first; larger catalogs are padded
+    with generated ones spread over the same categories.
+    """
+    catalog = []
+    for product_id in range(1, products + 1):
+        if product_id <= len(DEMO_PRODUCTS):
+            demo = DEMO_PRODUCTS[product_id - 1]
+            catalog.append(
+                (
+                    product_id,
+                    demo["name"],
+                    demo["sku"],
+                    _cents(demo["price"]),
+                    _cents(demo["cost"]),
+                    demo["category"] + 1,
+                )
             )
-            db.add(inventory)
-            inventories.append(inventory)
-
-        db.flush()
-
-        platforms = ["Amazon", "Walmart"]
-        customer_emails = [
-            "customer1@email.com",
-            "customer2@email.com",
-            "customer3@email.com",
-            "customer4@email.com",
-            "customer5@email.com",
-            "customer6@email.com",
-            "customer7@email.com",
-            "customer8@email.com",
-            "customer9@email.com",
-            "customer10@email.com",
-        ]
-
-        start_date = datetime.utcnow() - timedelta(days=365)
-        sales_data = []
-
-        for day_offset in range(365):
-            current_date = start_date + timedelta(days=day_offset)
-
-            daily_sales_count = random.randint(2, 15)
-            if current_date.weekday() >= 5:  # Weekend
-                daily_sales_count = int(daily_sales_count * 1.5)
-
-            for _ in range(daily_sales_count):
-                product = random.choice(products)
-                quantity = random.randint(1, 5)
-
-                price_variation = 1 + (random.random() - 0.5) * 0.4
-                unit_price = product.price * Decimal(str(price_variation))
-                unit_price = unit_price.quantize(Decimal("0.01"))
-
-                sale = Sale(
-                    product_id=product.id,
-                    quantity=quantity,
-                    unit_price=unit_price,
-                    total_amount=unit_price * quantity,
-                    customer_email=random.choice(customer_emails)
-                    if random.random() > 0.3
-                    else None,
-                    platform=random.choice(platforms),
-                    order_id=f"ORD-{random.randint(100000, 999999)}",
-                    sale_date=current_date
-                    + timedelta(
-                        hours=random.randint(0, 23), minutes=random.randint(0, 59)
-                    ),
+        else:
+            price = rng.randint(500, 20000)
+            catalog.append(
+                (
+                    product_id,
+                    _generated_name(product_id),
+                    f"GEN-{product_id:08d}",
+                    price,
+                    int(price * rng.uniform(0.3, 0.45)),
+                    rng.randrange(len(CATEGORIES)) + 1,
                 )
-                sales_data.append(sale)
+            )
+    return catalog
 
-        for i in range(0, len(sales_data), 1000):
-            batch = sales_data[i : i + 1000]
-            db.add_all(batch)
-            db.flush()
 
-        db.commit()
+def _daily_counts(
+    rng: random.Random, days: Sequence[date], sales: Optional[int]
+) -> List[int]:
+    """Sales per day: 2-15 with a 1.5x weekend boost, rescaled to ``sales``."""
+    weights = [
+        int(rng.randint(2, 15) * (1.5 if day.weekday() >= 5 else 1)) for day in days
+    ]
+    if sales is None:
+        return weights
+
+    total = sum(weights)
+    exact = [weight * sales / total for weight in weights]
+    counts = [int(share) for share in exact]
+    # Hand the rounding remainder to the days that lost the most.
+    by_remainder = sorted(range(len(days)), key=lambda i: counts[i] - exact[i])
+    for i in by_remainder[: sales - sum(counts)]:
+        counts[i] += 1
+    return counts
+
 
-        print(f"Database seeded successfully!")
-        print(f"Created {len(categories)} categories")
-        print(f"Created {len(products)} products")
-        print(f"Created {len(inventories)} inventory records")
-        print(f"Created {len(sales_data)} sales records")
+def _plan_chunks(days: Sequence[date], counts: Sequence[int]) -> List[Tuple]:
+    """Cut the day-by-day counts into ``(index, first_id, [(day, n), ...])``."""
+    chunks, current, size, first_id = [], [], 0, 1
+    for day, count in zip(days, counts):
+        while count:
+            take = min(count, SALES_CHUNK - size)
+            current.append((day, take))
+            size += take
+            count -= take
+            if size == SALES_CHUNK:
+                chunks.append((len(chunks), first_id, current))
+                first_id += size
+                current, size = [], 0
+    if current:
+        chunks.append((len(chunks), first_id, current))
+    return chunks
 
-    except Exception as e:
-        db.rollback()
-        print(f"Error seeding database: {e}")
-        raise
+
+_worker_state = {}
+
+
+def _init_worker(catalog, platforms, seed) -> None:
+    # Connections inherited from the parent must not be reused after a fork.
+    engine.dispose(close=False)
+    names = list(platforms)
+    cumulative, running = [], 0.0
+    for name in names:
+        running += platforms[name]
+        cumulative.append(running / sum(platforms.values()))
+    _worker_state.update(
+        products=[(row[0], row[3]) for row in catalog],
+        platform_names=names,
+        platform_cumulative=cumulative,
+        seed=seed,
+    )
+
+
+def _generate_chunk(chunk: Tuple) -> int:
+    index, first_id, day_counts = chunk
+    state = _worker_state
+    rng = random.Random(f"{state['seed']}:{index}")
+    products = state["products"]
+    names, cumulative = state["platform_names"], state["platform_cumulative"]
+
+    rows = io.StringIO()
+    sale_id = first_id
+    for day, count in day_counts:
+        day_prefix = day.isoformat()
+        for _ in range(count):
+            product_id, price = rng.choice(products)
+            quantity = rng.randint(1, 5)
+            unit_price = round(price * (1 + (rng.random() - 0.5) * 0.4))
+            email = rng.choice(CUSTOMER_EMAILS) if rng.random() > 0.3 else ""
+            platform = names[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+            rows.write(
+                f"{sale_id},{product_id},{quantity},{_money(unit_price)},"
+                f"{_money(unit_price * quantity)},{email},{platform},"
+                f"ORD-{rng.randint(100000, 999999)},"
+                f"{day_prefix} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+                ":00+00\n"
+            )
+            sale_id += 1
+
+    connection = engine.raw_connection()
+    try:
+        _copy(connection.cursor(), "sales", SALE_COLUMNS, rows)
+        connection.commit()
+    finally:
+        connection.close()
+    return sale_id - first_id
+
+
+def _load_catalog(cursor, rng: random.Random, catalog: List[Tuple]) -> None:
+    rows = io.StringIO()
+    for category_id, category in enumerate(CATEGORIES, start=1):
+        rows.write(f'{category_id},"{category["name"]}","{category["description"]}"\n')
+    _copy(cursor, "categories", "id, name, description", rows)
+
+    rows = io.StringIO()
+    for product_id, name, sku, price, cost, category_id in catalog:
+        rows.write(
+            f'{product_id},"{name}",{sku},{_money(price)},{_money(cost)},'
+            f"{category_id},true\n"
+        )
+    _copy(
+        cursor, "products", "id, name, sku, price, cost, category_id, is_active", rows
+    )
+
+    rows = io.StringIO()
+    for product_id, *_ in catalog:
+        rows.write(f"{product_id},{product_id},{rng.randint(10, 500)},")
+        rows.write(f"{rng.randint(5, 25)}\n")
+    _copy(cursor, "inventory", "id, product_id, quantity, low_stock_threshold", rows)
+
+
+def seed_database(
+    sales: Optional[int] = None,
+    days: int = 365,
+    products: int = len(DEMO_PRODUCTS),
+    platforms: Optional[Dict[str, float]] = None,
+    workers: int = 1,
+    seed: int = 0,
+    end_date: Optional[date] = None,
+) -> Dict[str, int]:
+    """Replace all data with a generated dataset and return the row counts.
+
+    ``sales=None`` keeps the demo volume of 2-15 sales a day; any other value
+    is spread over the same weekday/weekend shape. Sales cover the ``days``
+    days before ``end_date`` (today in UTC by default).
+    """
+    platforms = platforms or DEFAULT_PLATFORMS
+    end_date = end_date or datetime.now(timezone.utc).date()
+    rng = random.Random(seed)
+
+    Base.metadata.create_all(bind=engine)
+    catalog = _build_catalog(rng, products)
+    day_list = [end_date - timedelta(days=days - offset) for offset in range(days)]
+    chunks = _plan_chunks(day_list, _daily_counts(rng, day_list, sales))
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "TRUNCATE sales_daily_rollup, sales, inventory_logs, inventory, "
+            "products, categories RESTART IDENTITY CASCADE"
+        )
+        _load_catalog(cursor, rng, catalog)
+        connection.commit()
+    finally:
+        connection.close()
+
+    db = SessionLocal()
+    try:
+        PartitionService(db).ensure_partitions(
+            day_list[0], add_months(end_date, SALES_PARTITIONS_AHEAD)
+        )
+    finally:
+        db.close()
+
+    created = 0
+    total = sum(count for _, _, day_counts in chunks for _, count in day_counts)
+    with Pool(workers, _init_worker, (catalog, platforms, seed)) as pool:
+        for count in pool.imap_unordered(_generate_chunk, chunks):
+            created += count
+            print(f"  {created}/{total} sales")
+
+    db = SessionLocal()
+    try:
+        # Ids were written explicitly, so move the sequences past them.
+        for table in ("categories", "products", "inventory", "sales"):
+            db.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                )
+            )
+        db.commit()
+        rollup_rows = RollupService(db).rebuild()
     finally:
         db.close()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+    return {
+        "categories": len(CATEGORIES),
+        "products": len(catalog),
+        "inventory": len(catalog),
+        "sales": created,
+        "rollup": rollup_rows,
+    }
@@ -0,0 +1,115 @@
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Iterable, NamedTuple, Optional, Tuple
+
+from services.cache import LRUCache
+from services.rollup_service import as_utc
+
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "1024"))
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "30"))
+
+# (sale_date, product_id, category_id, platform) of a committed sale.
+SaleFootprint = Tuple[datetime, int, Optional[int], Optional[str]]
+
+
+class AnalyticsKey(NamedTuple):
+    kind: str
+    start: datetime
+    end: datetime
+    product_id: Optional[int]
+    category_id: Optional[int]
+    platform: Optional[str]
+    # Rolling windows end at "now"; their bounds are quantized to the TTL so
+    # that polls within one TTL share an entry.
+    rolling: bool
+
+
+class AnalyticsCache:
+    """TTL cache of analytics results, invalidated by committed sales.
+
+    Readers take ``generation`` before querying and hand it back to ``set``;
+    a result whose query overlapped an invalidation may predate the sale that
+    caused it, so it is not cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize if ttl > 0 else 0, ttl)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def key(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        product_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+        rolling: bool = False,
+    ) -> AnalyticsKey:
+        start = as_utc(start_date)
+        end = as_utc(end_date)
+        if rolling:
+            start = self._quantize(start)
+            end = self._quantize(end)
+        return AnalyticsKey(
+            kind,
+            start,
+            end,
+            product_id or None,
+            category_id or None,
+            platform or None,
+            rolling,
+        )
+
+    def _quantize(self, value: datetime) -> datetime:
+        step = self._cache.ttl or 1
+        return datetime.fromtimestamp(value.timestamp() // step * step, tz=timezone.utc)
+
+    def get(self, key: AnalyticsKey) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: AnalyticsKey, value: Any, generation: int) -> None:
+        if generation == self._generation:
+            self._cache.set(key, value)
+
+    def invalidate_sales(self, sales: Iterable[SaleFootprint]) -> int:
+        """Drop entries whose window and filters could include any of ``sales``."""
+        sales = list(sales)
+        if not sales:
+            return 0
+
+        sale_dates = [as_utc(sale[0]) for sale in sales]
+        earliest, latest = min(sale_dates), max(sale_dates)
+        product_ids = {sale[1] for sale in sales}
+        category_ids = {sale[2] for sale in sales}
+        platforms = {sale[3] for sale in sales}
+
+        def affected(key: AnalyticsKey) -> bool:
+            return (
+                key.start <= latest
+                and (key.rolling or earliest <= key.end)
+                and (key.product_id is None or key.product_id in product_ids)
+                and (key.category_id is None or key.category_id in category_ids)
+                and (key.platform is None or key.platform in platforms)
+            )
+
+        with self._lock:
+            self._generation += 1
+        return self._cache.invalidate_where(affected)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+analytics_cache = AnalyticsCache(ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL)
@@ -0,0 +1,243 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from decimal import Decimal
+from select import select as wait_readable
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import psycopg2
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from database import DATABASE_URL
+from models import Category, Product
+from services.cache import MISSING, LRUCache
+
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "10000"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_NOTIFY = os.getenv("CATALOG_NOTIFY", "true").lower() == "true"
+NOTIFY_CHANNEL = "catalog_invalidate"
+
+logger = logging.getLogger("ecommerce.catalog")
+
+
+class CachedProduct(NamedTuple):
+    id: int
+    sku: str
+    name: str
+    category_id: int
+    price: Decimal
+    cost: Decimal
+    is_active: Optional[bool]
+
+
+class CachedCategory(NamedTuple):
+    id: int
+    name: str
+    description: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+PRODUCT_FIELDS = [getattr(Product, field) for field in CachedProduct._fields]
+CATEGORY_FIELDS = [getattr(Category, field) for field in CachedCategory._fields]
+
+ALL_CATEGORIES = ("categories",)
+
+
+class CatalogCache:
+    """Read-through cache of products (by id and SKU) and categories.
+
+    Writers call ``notify`` inside their transaction and ``invalidate`` after
+    the commit. The NOTIFY is delivered to every worker's listener only when
+    the transaction commits, so other workers drop their copies as soon as the
+    change is visible. A load that overlaps an invalidation is not cached, and
+    the TTL bounds staleness if the listener is disconnected.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUCache(maxsize, ttl or None)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # -- reads -------------------------------------------------------------
+
+    def _store(self, generation: int, entries: Dict) -> None:
+        # An invalidation that ran while the rows were being read may have
+        # been for one of them, and the rows may predate it.
+        if generation == self._generation:
+            for key, value in entries.items():
+                self._cache.set(key, value)
+
+    def get_products(self, db: Session, ids: Iterable[int]) -> Dict[int, CachedProduct]:
+        """Return the existing products among ``ids``, loading misses in one query."""
+        found, missing = {}, []
+        for product_id in set(ids):
+            product = self._cache.get(("product", product_id))
+            if product is MISSING:
+                missing.append(product_id)
+            else:
+                found[product_id] = product
+
+        if missing:
+            generation = self._generation
+            loaded = {
+                row.id: CachedProduct(*row)
+                for row in db.execute(
+                    select(*PRODUCT_FIELDS).where(Product.id.in_(missing))
+                )
+            }
+            self._store(
+                generation,
+                {
+                    **{("product", p.id): p for p in loaded.values()},
+                    **{("sku", p.sku): p.id for p in loaded.values()},
+                },
+            )
+            found.update(loaded)
+        return found
+
+    def get_product(self, db: Session, product_id: int) -> Optional[CachedProduct]:
+        return self.get_products(db, [product_id]).get(product_id)
+
+    def get_products_by_sku(
+        self, db: Session, skus: Iterable[str]
+    ) -> Dict[str, CachedProduct]:
+        """Return the existing products among ``skus``, loading misses in one query."""
+        found, missing, mapped = {}, [], {}
+        for sku in set(skus):
+            product_id = self._cache.get(("sku", sku))
+            if product_id is MISSING:
+                missing.append(sku)
+            else:
+                mapped[sku] = product_id
+
+        products = self.get_products(db, mapped.values())
+        for sku, product_id in mapped.items():
+            product = products.get(product_id)
+            # A renamed SKU leaves its old mapping behind; check before trusting it.
+            if product is not None and product.sku == sku:
+                found[sku] = product
+            else:
+                missing.append(sku)
+
+        if missing:
+            generation = self._generation
+            loaded = {
+                row.sku: CachedProduct(*row)
+                for row in db.execute(
+                    select(*PRODUCT_FIELDS).where(Product.sku.in_(missing))
+                )
+            }
+            self._store(
+                generation,
+                {
+                    **{("product", p.id): p for p in loaded.values()},
+                    **{("sku", p.sku): p.id for p in loaded.values()},
+                },
+            )
+            found.update(loaded)
+        return found
+
+    def list_categories(self, db: Session) -> List[CachedCategory]:
+        """All categories ordered by id; the table is small and rarely written."""
+        categories = self._cache.get(ALL_CATEGORIES)
+        if categories is MISSING:
+            generation = self._generation
+            categories = [
+                CachedCategory(*row)
+                for row in db.execute(select(*CATEGORY_FIELDS).order_by(Category.id))
+            ]
+            self._store(generation, {ALL_CATEGORIES: categories})
+        return categories
+
+    def get_category(self, db: Session, category_id: int) -> Optional[CachedCategory]:
+        for category in self.list_categories(db):
+            if category.id == category_id:
+                return category
+        return None
+
+    # -- invalidation ------------------------------------------------------
+
+    def notify(self, db: Session, kind: str, key_id: Optional[int] = None) -> None:
+        """Queue a cross-worker invalidation, sent when ``db`` commits."""
+        if CATALOG_NOTIFY:
+            db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": f"{kind}:{key_id or ''}"},
+            )
+
+    def invalidate(self, kind: str, key_id: Optional[int] = None) -> None:
+        """Drop a ``product`` (by id) or every ``category`` from this worker."""
+        with self._lock:
+            self._generation += 1
+        if kind == "product" and key_id is not None:
+            self._cache.invalidate(("product", key_id))
+        elif kind == "category":
+            self._cache.invalidate(ALL_CATEGORIES)
+        else:
+            self._cache.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+catalog_cache = CatalogCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL)
+
+
+def _handle_notification(payload: str) -> None:
+    kind, _, key_id = payload.partition(":")
+    catalog_cache.invalidate(kind, int(key_id) if key_id.isdigit() else None)
+
+
+def _listen_forever(stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            connection = psycopg2.connect(DATABASE_URL)
+        except psycopg2.Error:
+            logger.warning("Catalog listener cannot connect; retrying", exc_info=True)
+            stop.wait(5)
+            continue
+        try:
+            connection.autocommit = True
+            connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+            # Anything changed while no listener was connected is unknown.
+            catalog_cache.clear()
+            while not stop.is_set():
+                if wait_readable([connection], [], [], 5) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    _handle_notification(connection.notifies.pop(0).payload)
+        except psycopg2.Error:
+            logger.warning("Catalog listener lost its connection", exc_info=True)
+            stop.wait(1)
+        finally:
+            connection.close()
+
+
+_listener: Optional[threading.Thread] = None
+_stop_listening = threading.Event()
+
+
+def start_listening() -> None:
+    """Follow other workers' catalog writes over LISTEN/NOTIFY."""
+    global _listener
+    if CATALOG_NOTIFY and _listener is None:
+        _listener = threading.Thread(
+            target=_listen_forever,
+            args=(_stop_listening,),
+            name="catalog-listener",
+            daemon=True,
+        )
+        _listener.start()
+
+
+def stop_listening() -> None:
+    _stop_listening.set()
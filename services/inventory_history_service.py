@@ -0,0 +1,168 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from models import Inventory, InventoryLog, InventorySnapshot, Product
+from services.rollup_service import as_utc, start_of_day
+
+INVENTORY_LOG_RETENTION_DAYS = int(os.getenv("INVENTORY_LOG_RETENTION_DAYS", "90"))
+COMPACTION_BATCH = 1_000  # inventory rows per compaction transaction
+
+# Deletes the log entries of a range of inventory ids older than the cutoff and
+# folds each row's entries into one snapshot per UTC day, taken at the end of
+# that day. A snapshot already there (a rerun) absorbs late-arriving entries
+# into its counts, but only takes their quantity if they are not older than
+# the newest entry it was built from (``as_of``).
+COMPACT_BATCH = text(
+    """
+    WITH archived AS (
+        DELETE FROM inventory_logs
+        WHERE inventory_id >= :first_id AND inventory_id < :end_id
+          AND created_at < :cutoff
+        RETURNING id, inventory_id, previous_quantity, new_quantity, created_at
+    ), folded AS (
+        SELECT inventory_id,
+               (date_trunc('day', created_at AT TIME ZONE 'UTC') + interval '1 day')
+                   AT TIME ZONE 'UTC' AS taken_at,
+               (array_agg(new_quantity ORDER BY created_at DESC, id DESC))[1]
+                   AS quantity,
+               max(created_at) AS as_of,
+               count(*) AS archived_logs,
+               sum(greatest(new_quantity - previous_quantity, 0)) AS units_in,
+               sum(greatest(previous_quantity - new_quantity, 0)) AS units_out
+        FROM archived
+        GROUP BY 1, 2
+    ), written AS (
+        INSERT INTO inventory_snapshots AS s
+            (inventory_id, taken_at, quantity, as_of,
+             archived_logs, units_in, units_out)
+        SELECT inventory_id, taken_at, quantity, as_of,
+               archived_logs, units_in, units_out
+        FROM folded
+        ON CONFLICT (inventory_id, taken_at) DO UPDATE SET
+            quantity = CASE WHEN excluded.as_of >= s.as_of
+                            THEN excluded.quantity ELSE s.quantity END,
+            as_of = greatest(s.as_of, excluded.as_of),
+            archived_logs = s.archived_logs + excluded.archived_logs,
+            units_in = s.units_in + excluded.units_in,
+            units_out = s.units_out + excluded.units_out
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM archived), (SELECT count(*) FROM written)
+    """
+)
+
+
+class InventoryHistoryService:
+    """Point-in-time stock levels from inventory logs and their snapshots.
+
+    Every log entry stores the quantity it left behind, so the stock at a
+    moment is the newest log entry or snapshot at or before it: two index
+    probes, whatever the length of the history. Compaction replaces entries
+    older than the retention window with daily snapshots, so history beyond
+    the window resolves to the closing stock of each day that had changes.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def stock_at(self, inventory_id: int, at: datetime) -> Dict:
+        at = as_utc(at)
+        inventory = self.db.execute(
+            select(Inventory.quantity, Product.created_at)
+            .join(Product, Product.id == Inventory.product_id)
+            .where(Inventory.id == inventory_id)
+        ).one_or_none()
+        if inventory is None:
+            raise ValueError("Inventory not found")
+        if inventory.created_at is not None and at < inventory.created_at:
+            raise ValueError("Product did not exist at that time")
+
+        log = self.db.execute(
+            select(InventoryLog.new_quantity, InventoryLog.created_at)
+            .where(InventoryLog.inventory_id == inventory_id)
+            .where(InventoryLog.created_at <= at)
+            .order_by(InventoryLog.created_at.desc(), InventoryLog.id.desc())
+            .limit(1)
+        ).one_or_none()
+        snapshot = self.db.execute(
+            select(InventorySnapshot.quantity, InventorySnapshot.taken_at)
+            .where(InventorySnapshot.inventory_id == inventory_id)
+            .where(InventorySnapshot.taken_at <= at)
+            .order_by(InventorySnapshot.taken_at.desc())
+            .limit(1)
+        ).one_or_none()
+
+        result = {"inventory_id": inventory_id, "at": at}
+        if log is not None and (
+            snapshot is None or log.created_at >= snapshot.taken_at
+        ):
+            return {
+                **result,
+                "quantity": log.new_quantity,
+                "source": "log",
+                "recorded_at": log.created_at,
+            }
+        if snapshot is not None:
+            return {
+                **result,
+                "quantity": snapshot.quantity,
+                "source": "snapshot",
+                "recorded_at": snapshot.taken_at,
+            }
+
+        # Nothing recorded yet at ``at``: the stock then is what the first
+        # later change started from, or today's level if it never changed.
+        if self.db.scalar(
+            select(InventorySnapshot.taken_at)
+            .where(InventorySnapshot.inventory_id == inventory_id)
+            .limit(1)
+        ):
+            raise ValueError("Stock history before that time has been compacted")
+        later = self.db.execute(
+            select(InventoryLog.previous_quantity, InventoryLog.created_at)
+            .where(InventoryLog.inventory_id == inventory_id)
+            .order_by(InventoryLog.created_at, InventoryLog.id)
+            .limit(1)
+        ).one_or_none()
+        if later is not None:
+            return {
+                **result,
+                "quantity": later.previous_quantity,
+                "source": "log",
+                "recorded_at": later.created_at,
+            }
+        return {**result, "quantity": inventory.quantity, "source": "current"}
+
+    def compact(
+        self, cutoff: Optional[datetime] = None, batch_size: int = COMPACTION_BATCH
+    ) -> Dict:
+        """Fold log entries created before ``cutoff`` into daily snapshots.
+
+        Defaults to ``INVENTORY_LOG_RETENTION_DAYS`` ago, and is rounded down to
+        a UTC midnight so only whole days are compacted. Runs one transaction
+        per ``batch_size`` inventory ids so locks and WAL stay bounded, and
+        returns the number of log entries archived and snapshots written.
+        """
+        if cutoff is None:
+            cutoff = datetime.now(timezone.utc) - timedelta(
+                days=INVENTORY_LOG_RETENTION_DAYS
+            )
+        cutoff = start_of_day(as_utc(cutoff).date())
+
+        archived = snapshots = 0
+        last_id = self.db.scalar(select(Inventory.id).order_by(Inventory.id.desc()))
+        for first_id in range(1, (last_id or 0) + 1, batch_size):
+            params = {
+                "first_id": first_id,
+                "end_id": first_id + batch_size,
+                "cutoff": cutoff,
+            }
+            logs, written = self.db.execute(COMPACT_BATCH, params).one()
+            archived += logs
+            snapshots += written
+            self.db.commit()
+        return {"cutoff": cutoff, "archived_logs": archived, "snapshots": snapshots}
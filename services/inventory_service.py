@@ -1,57 +1,264 @@
-from typing import List
+from collections import Counter
+from typing import Dict, List
 
+from sqlalchemy import (Integer, String, case, column, func, insert, select,
+                        update, values)
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
-from models import Inventory, InventoryLog, Product
-from schemas import ChangeType, InventoryUpdate
+from models import Category, Inventory, InventoryLog, Product
+from schemas import (ChangeType, InventoryBatchItemResult,
+                     InventoryBatchResponse, InventoryBatchUpdate,
+                     InventoryUpdate)
+from serializers import CATEGORY_COLUMNS, INVENTORY_COLUMNS, PRODUCT_COLUMNS
+from services.catalog_cache import catalog_cache
+from services.live_events import live_events
 
 
 class InventoryService:
     def __init__(self, db: Session):
         self.db = db
 
-    def update_inventory(
-        self, inventory_id: int, update_data: InventoryUpdate
-    ) -> Inventory:
-        inventory = (
-            self.db.query(Inventory).filter(Inventory.id == inventory_id).first()
-        )
-        if not inventory:
-            raise ValueError("Inventory not found")
+    def _apply_stock_changes(self, locked, new_quantity, *criteria) -> List[Row]:
+        """Set ``quantity`` on the rows matched by ``locked`` in one statement.
 
-        previous_quantity = inventory.quantity
+        The rows are locked by a FOR UPDATE subquery, so the previous quantity
+        returned alongside the new one is exactly the value this UPDATE
+        replaced, even when concurrent writers hit the same row.
+        """
+        previous = (
+            select(Inventory.id, Inventory.quantity.label("previous_quantity"))
+            .where(locked)
+            .order_by(Inventory.id)
+            .with_for_update()
+            .subquery("previous")
+        )
+        stmt = (
+            update(Inventory)
+            .where(Inventory.id == previous.c.id, *criteria)
+            .values(quantity=new_quantity)
+            .returning(
+                Inventory.id,
+                Inventory.product_id,
+                previous.c.previous_quantity,
+                Inventory.quantity.label("new_quantity"),
+                Inventory.low_stock_threshold,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).all()
 
+    def update_inventory(self, inventory_id: int, update_data: InventoryUpdate) -> Row:
         if update_data.change_type == ChangeType.STOCK_IN:
-            new_quantity = previous_quantity + update_data.quantity_change
+            new_quantity = Inventory.quantity + update_data.quantity_change
         elif update_data.change_type == ChangeType.STOCK_OUT:
-            new_quantity = max(0, previous_quantity - update_data.quantity_change)
+            new_quantity = func.greatest(
+                0, Inventory.quantity - update_data.quantity_change
+            )
         else:
-            new_quantity = max(0, previous_quantity + update_data.quantity_change)
+            new_quantity = func.greatest(
+                0, Inventory.quantity + update_data.quantity_change
+            )
 
-        inventory.quantity = new_quantity
+        rows = self._apply_stock_changes(Inventory.id == inventory_id, new_quantity)
+        if not rows:
+            raise ValueError("Inventory not found")
+        change = rows[0]
 
         log_entry = InventoryLog(
             inventory_id=inventory_id,
             change_type=update_data.change_type.value,
             quantity_change=update_data.quantity_change,
-            previous_quantity=previous_quantity,
-            new_quantity=new_quantity,
+            previous_quantity=change.previous_quantity,
+            new_quantity=change.new_quantity,
             reason=update_data.reason,
         )
 
         self.db.add(log_entry)
         self.db.commit()
-        self.db.refresh(inventory)
+        live_events.publish_stock_changes(rows)
 
-        return inventory
+        return change
+
+    def update_inventory_batch(
+        self, updates: List[InventoryBatchUpdate]
+    ) -> InventoryBatchResponse:
+        """Apply many stock updates in one transaction with per-item results.
+
+        Each round is a single UPDATE ... FROM VALUES over distinct inventory
+        rows; a row named more than once is updated again in a later round,
+        so its entries apply in request order. Log rows go in one insert.
+        """
+        skus = {
+            update_data.sku
+            for update_data in updates
+            if update_data.inventory_id is None and update_data.sku is not None
+        }
+        inventory_by_sku = {}
+        if skus:
+            products = catalog_cache.get_products_by_sku(self.db, skus)
+            inventory_ids = dict(
+                self.db.execute(
+                    select(Inventory.product_id, Inventory.id).where(
+                        Inventory.product_id.in_(
+                            {product.id for product in products.values()}
+                        )
+                    )
+                ).all()
+            )
+            inventory_by_sku = {
+                sku: inventory_ids[product.id]
+                for sku, product in products.items()
+                if product.id in inventory_ids
+            }
+
+        errors = {}
+        rounds: List[Dict[int, int]] = []
+        seen = Counter()
+        for index, update_data in enumerate(updates):
+            if (update_data.inventory_id is None) == (update_data.sku is None):
+                errors[index] = "Give either inventory_id or sku"
+                continue
+            inventory_id = update_data.inventory_id
+            if inventory_id is None:
+                inventory_id = inventory_by_sku.get(update_data.sku)
+                if inventory_id is None:
+                    errors[index] = "Inventory not found"
+                    continue
+            if seen[inventory_id] == len(rounds):
+                rounds.append({})
+            rounds[seen[inventory_id]][inventory_id] = index
+            seen[inventory_id] += 1
+
+        applied = {}
+        for targets in rounds:
+            changes = values(
+                column("inventory_id", Integer),
+                column("change_type", String),
+                column("quantity_change", Integer),
+                name="changes",
+            ).data(
+                sorted(
+                    (
+                        inventory_id,
+                        updates[index].change_type.value,
+                        updates[index].quantity_change,
+                    )
+                    for inventory_id, index in targets.items()
+                )
+            )
+            new_quantity = case(
+                (
+                    changes.c.change_type == ChangeType.STOCK_IN.value,
+                    Inventory.quantity + changes.c.quantity_change,
+                ),
+                (
+                    changes.c.change_type == ChangeType.STOCK_OUT.value,
+                    func.greatest(0, Inventory.quantity - changes.c.quantity_change),
+                ),
+                else_=func.greatest(0, Inventory.quantity + changes.c.quantity_change),
+            )
+            for change in self._apply_stock_changes(
+                Inventory.id.in_(targets),
+                new_quantity,
+                Inventory.id == changes.c.inventory_id,
+            ):
+                applied[targets[change.id]] = change
 
-    def get_low_stock_items(self) -> List[Inventory]:
-        return (
-            self.db.query(Inventory)
-            .join(Product)
-            .filter(
-                Inventory.quantity <= Inventory.low_stock_threshold,
-                Product.is_active == True,
+        if applied:
+            self.db.execute(
+                insert(InventoryLog),
+                [
+                    {
+                        "inventory_id": change.id,
+                        "change_type": updates[index].change_type.value,
+                        "quantity_change": updates[index].quantity_change,
+                        "previous_quantity": change.previous_quantity,
+                        "new_quantity": change.new_quantity,
+                        "reason": updates[index].reason,
+                    }
+                    for index, change in sorted(applied.items())
+                ],
             )
-            .all()
+            self.db.commit()
+            live_events.publish_stock_changes(
+                change for _, change in sorted(applied.items())
+            )
+
+        results = []
+        for index in range(len(updates)):
+            change = applied.get(index)
+            if change is None:
+                results.append(
+                    InventoryBatchItemResult(
+                        index=index, error=errors.get(index, "Inventory not found")
+                    )
+                )
+                continue
+            results.append(
+                InventoryBatchItemResult(
+                    index=index,
+                    inventory_id=change.id,
+                    previous_quantity=change.previous_quantity,
+                    new_quantity=change.new_quantity,
+                    is_low_stock=(
+                        change.low_stock_threshold is not None
+                        and change.new_quantity <= change.low_stock_threshold
+                    ),
+                )
+            )
+
+        return InventoryBatchResponse(
+            updated=len(applied), failed=len(updates) - len(applied), results=results
+        )
+
+    def deduct_sold_stock(self, sold: Dict[int, int], reason: str) -> List[Row]:
+        """Subtract sold quantities per product id in one UPDATE ... FROM VALUES.
+
+        Runs inside the caller's transaction, never takes stock below zero and
+        writes one ``stock_out`` log row per inventory record touched.
+        """
+        if not sold:
+            return []
+
+        sold_rows = values(
+            column("product_id", Integer), column("quantity", Integer), name="sold"
+        ).data(sorted(sold.items()))
+        changes = self._apply_stock_changes(
+            Inventory.product_id.in_(sold),
+            func.greatest(0, Inventory.quantity - sold_rows.c.quantity),
+            Inventory.product_id == sold_rows.c.product_id,
+        )
+
+        if changes:
+            self.db.execute(
+                insert(InventoryLog),
+                [
+                    {
+                        "inventory_id": change.id,
+                        "change_type": ChangeType.STOCK_OUT.value,
+                        "quantity_change": sold[change.product_id],
+                        "previous_quantity": change.previous_quantity,
+                        "new_quantity": change.new_quantity,
+                        "reason": reason,
+                    }
+                    for change in changes
+                ],
+            )
+
+        return changes
+
+    def get_low_stock_items(self) -> List[Row]:
+        """Low-stock rows of active products, projected for ``inventory_row``.
+
+        Filters on the stored ``is_low_stock`` flag so the partial index
+        supplies the candidates instead of a scan of the whole table.
+        """
+        query = (
+            select(*INVENTORY_COLUMNS, *PRODUCT_COLUMNS, *CATEGORY_COLUMNS)
+            .join(Product, Product.id == Inventory.product_id)
+            .join(Category, Category.id == Product.category_id)
+            .where(Inventory.is_low_stock == True, Product.is_active == True)
+            .order_by(Inventory.id)
         )
+        return self.db.execute(query).all()
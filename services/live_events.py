@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import func, select
+
+from database import AsyncSessionLocal
+from models import SalesDailyRollup
+from services.rollup_service import as_utc
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_TOTALS_REFRESH = float(os.getenv("EVENT_TOTALS_REFRESH", "30"))
+EVENT_KEEPALIVE = float(os.getenv("EVENT_KEEPALIVE", "15"))
+
+TODAY_TOTALS = select(
+    func.coalesce(func.sum(SalesDailyRollup.total_revenue), 0),
+    func.coalesce(func.sum(SalesDailyRollup.order_count), 0),
+    func.coalesce(func.sum(SalesDailyRollup.quantity_sold), 0),
+)
+
+# Sent to a client whose queue overflowed, just before its stream is closed.
+DROPPED_MESSAGE = b'event: dropped\ndata: {"reason": "slow consumer"}\n\n'
+
+
+def _message(event: str, data: dict) -> bytes:
+    return (
+        b"event: "
+        + event.encode()
+        + b"\ndata: "
+        + orjson.dumps(data, default=str, option=orjson.OPT_UTC_Z)
+        + b"\n\n"
+    )
+
+
+class Subscriber:
+    def __init__(self, maxsize: int):
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class LiveEvents:
+    """In-process fan-out of committed sales and low-stock transitions.
+
+    Writers call the ``publish_*`` methods from any thread after their commit;
+    the events are handed to the event loop and copied into one bounded queue
+    per connected client. A client that lets its queue fill up is dropped
+    instead of buffering without limit, and can reconnect for a fresh start.
+
+    Today's UTC totals are loaded from the rollup when the first client connects
+    and every ``EVENT_TOTALS_REFRESH`` seconds after, and advanced by each sale
+    in between, so all clients share one query per worker instead of polling.
+    Sales committed by other workers only show up at the next refresh.
+    """
+
+    def __init__(self, queue_size: int, refresh_seconds: float):
+        self.queue_size = queue_size
+        self.refresh_seconds = refresh_seconds
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._totals: Optional[dict] = None
+        self.published = 0
+        self.dropped = 0
+
+    # -- subscribers, on the event loop ------------------------------------
+
+    def subscribe(self) -> Subscriber:
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        if self._refresh_task is None:
+            # A fresh context keeps the refresh queries out of the per-request
+            # SQL stats of whichever client happened to connect first.
+            self._refresh_task = self._loop.create_task(
+                self._refresh_totals(), context=contextvars.Context()
+            )
+        elif self._totals is not None:
+            subscriber.queue.put_nowait(_message("totals", self._totals))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+            self._totals = None
+
+    def _fan_out(self, message: bytes) -> None:
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+                self._subscribers.discard(subscriber)
+                self.dropped += 1
+
+    async def _refresh_totals(self) -> None:
+        while True:
+            today = datetime.now(timezone.utc).date()
+            try:
+                async with AsyncSessionLocal() as db:
+                    revenue, orders, quantity = (
+                        await db.execute(
+                            TODAY_TOTALS.where(SalesDailyRollup.sale_day == today)
+                        )
+                    ).one()
+            except Exception:
+                # Keep serving the last known totals; the next refresh retries.
+                await asyncio.sleep(self.refresh_seconds)
+                continue
+            self._totals = {
+                "day": today,
+                "revenue": revenue,
+                "orders": orders,
+                "quantity": quantity,
+            }
+            self._fan_out(_message("totals", self._totals))
+            await asyncio.sleep(self.refresh_seconds)
+
+    def _apply_sales(
+        self, event: str, data: dict, by_day: Dict[object, Tuple[Decimal, int, int]]
+    ) -> None:
+        if self._totals is not None and self._totals["day"] in by_day:
+            revenue, orders, quantity = by_day[self._totals["day"]]
+            self._totals["revenue"] += revenue
+            self._totals["orders"] += orders
+            self._totals["quantity"] += quantity
+        self._fan_out(_message(event, {**data, "totals": self._totals}))
+
+    # -- publishers, from any thread ---------------------------------------
+
+    def _call(self, callback, *args) -> None:
+        if self._subscribers and self._loop is not None:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def publish_sales(self, sales: List[Mapping], sale_ids: List[int]) -> None:
+        """Announce committed sales: one ``sale`` event, or a ``sales_batch``."""
+        if not self._subscribers or not sales:
+            return
+
+        by_day = defaultdict(lambda: [Decimal("0"), 0, 0])
+        for sale in sales:
+            day = by_day[as_utc(sale["sale_date"]).date()]
+            day[0] += Decimal(sale["total_amount"])
+            day[1] += 1
+            day[2] += sale["quantity"]
+
+        if len(sales) == 1:
+            sale = sales[0]
+            data = {
+                "id": sale_ids[0],
+                "product_id": sale["product_id"],
+                "quantity": sale["quantity"],
+                "unit_price": sale["unit_price"],
+                "total_amount": sale["total_amount"],
+                "platform": sale.get("platform"),
+                "order_id": sale.get("order_id"),
+                "sale_date": as_utc(sale["sale_date"]),
+            }
+            self._call(self._apply_sales, "sale", data, dict(by_day))
+        else:
+            revenue = sum(day[0] for day in by_day.values())
+            quantity = sum(day[2] for day in by_day.values())
+            data = {"created": len(sales), "revenue": revenue, "quantity": quantity}
+            self._call(self._apply_sales, "sales_batch", data, dict(by_day))
+
+    def publish_stock_changes(self, changes: Iterable) -> None:
+        """Announce inventory rows that crossed their low-stock threshold.
+
+        ``changes`` are the rows returned by ``InventoryService`` stock updates.
+        """
+        if not self._subscribers:
+            return
+        for change in changes:
+            threshold = change.low_stock_threshold
+            was_low = threshold is not None and change.previous_quantity <= threshold
+            is_low = threshold is not None and change.new_quantity <= threshold
+            if was_low != is_low:
+                data = {
+                    "inventory_id": change.id,
+                    "product_id": change.product_id,
+                    "quantity": change.new_quantity,
+                    "low_stock_threshold": threshold,
+                    "is_low_stock": is_low,
+                }
+                self._call(self._fan_out, _message("low_stock", data))
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "dropped_subscribers": self.dropped,
+        }
+
+    async def stream(self, is_disconnected):
+        """Yield SSE messages for one client until it disconnects or is dropped."""
+        subscriber = self.subscribe()
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscriber.queue.get(), EVENT_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        return
+                    message = b": keepalive\n\n"
+                if subscriber.dropped and subscriber.queue.empty():
+                    yield message
+                    yield DROPPED_MESSAGE
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+
+live_events = LiveEvents(EVENT_QUEUE_SIZE, EVENT_TOTALS_REFRESH)
@@ -0,0 +1,163 @@
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SALES_PARTITIONS_AHEAD = int(os.getenv("SALES_PARTITIONS_AHEAD", "3"))
+
+DEFAULT_PARTITION = "sales_default"
+_MONTHLY_PARTITION = re.compile(r"^sales_y(\d{4})m(\d{2})$")
+# Serializes partition DDL between workers starting at the same time.
+_PARTITION_LOCK_ID = 4_240_001
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"sales_y{month.year}m{month.month:02d}"
+
+
+class PartitionService:
+    """Creates, lists and retires the monthly partitions of ``sales``.
+
+    Partitions cover whole UTC months. Rows outside every monthly partition
+    land in ``sales_default``; creating the partition for their month moves
+    them out of it.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_partitioned(self) -> bool:
+        return bool(
+            self.db.execute(
+                text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'sales'::regclass")
+            ).scalar()
+        )
+
+    def _monthly_partitions(self) -> List[date]:
+        names = self.db.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'sales'::regclass"
+            )
+        )
+        months = []
+        for name in names:
+            match = _MONTHLY_PARTITION.match(name)
+            if match:
+                months.append(date(int(match[1]), int(match[2]), 1))
+        return sorted(months)
+
+    def list_partitions(self) -> List[dict]:
+        rows = self.db.execute(
+            text(
+                "SELECT c.relname AS name, "
+                "pg_get_expr(c.relpartbound, c.oid) AS bounds, "
+                "greatest(c.reltuples, 0)::bigint AS estimated_rows, "
+                "pg_total_relation_size(c.oid) AS total_bytes "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'sales'::regclass ORDER BY c.relname"
+            )
+        )
+        return [dict(row._mapping) for row in rows]
+
+    def _create_partition(self, month: date) -> None:
+        name = partition_name(month)
+        lower = f"{month.isoformat()} 00:00:00+00"
+        upper = f"{add_months(month, 1).isoformat()} 00:00:00+00"
+        bounds = f"FROM ('{lower}') TO ('{upper}')"
+        in_range = f"sale_date >= '{lower}' AND sale_date < '{upper}'"
+
+        detached = self.db.execute(
+            text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+        ).scalar()
+        stranded = self.db.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})")
+        ).scalar()
+        if not detached and not stranded:
+            self.db.execute(
+                text(f"CREATE TABLE {name} PARTITION OF sales FOR VALUES {bounds}")
+            )
+            return
+
+        # A table left behind by detach_before is attached again as it is.
+        # Postgres refuses to add a partition whose range still has rows in
+        # the default partition, so those rows move over before attaching.
+        if not detached:
+            self.db.execute(
+                text(
+                    f"CREATE TABLE {name} "
+                    "(LIKE sales INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+            )
+        self.db.execute(
+            text(
+                f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"
+            )
+        )
+        self.db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+        self.db.execute(
+            text(f"ALTER TABLE sales ATTACH PARTITION {name} FOR VALUES {bounds}")
+        )
+
+    def ensure_partitions(self, first: date, last: date) -> List[str]:
+        """Create any missing monthly partitions from ``first`` to ``last``."""
+        if not self.is_partitioned():
+            return []
+
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:id)"), {"id": _PARTITION_LOCK_ID}
+        )
+        existing = set(self._monthly_partitions())
+        created = []
+        month = month_start(first)
+        while month <= last:
+            if month not in existing:
+                self._create_partition(month)
+                created.append(partition_name(month))
+            month = add_months(month, 1)
+        self.db.commit()
+        return created
+
+    def ensure_ahead(self, months: int = SALES_PARTITIONS_AHEAD) -> List[str]:
+        """Create partitions for the current UTC month and ``months`` after it."""
+        this_month = month_start(datetime.now(timezone.utc).date())
+        return self.ensure_partitions(this_month, add_months(this_month, months))
+
+    def detach_before(self, cutoff: date, drop: bool = False) -> List[str]:
+        """Detach (or drop) monthly partitions that end on or before ``cutoff``.
+
+        Detached partitions stay as ordinary tables for archiving, and
+        ``ensure_partitions`` attaches them again if their month is requested.
+        The daily rollup is left alone, so analytics over retired months keep
+        working until the rollup is rebuilt.
+        """
+        if not self.is_partitioned():
+            return []
+
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:id)"), {"id": _PARTITION_LOCK_ID}
+        )
+        retired = []
+        for month in self._monthly_partitions():
+            if add_months(month, 1) > cutoff:
+                break
+            name = partition_name(month)
+            self.db.execute(text(f"ALTER TABLE sales DETACH PARTITION {name}"))
+            if drop:
+                self.db.execute(text(f"DROP TABLE {name}"))
+            retired.append(name)
+        self.db.commit()
+        return retired
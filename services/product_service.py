@@ -0,0 +1,305 @@
+import codecs
+import csv
+import json
+import os
+import re
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import case, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from models import Category, Inventory, Product
+from schemas import ProductCreate, ProductImportError, ProductImportResponse
+from serializers import CATEGORY_COLUMNS, PRODUCT_COLUMNS, STOCK_COLUMNS
+from services.catalog_cache import catalog_cache
+
+MAX_SEARCH_TERMS = 8
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+MAX_IMPORT_ERRORS = 1000  # reported row errors; later failures are only counted
+MAX_IMPORT_RECORD = 1024 * 1024  # characters in one CSV record or NDJSON line
+
+IMPORT_FIELDS = [
+    field
+    for field in ProductCreate.model_fields
+    if field not in ("initial_stock", "low_stock_threshold")
+]
+
+_TERM = re.compile(r"[\w][\w.-]*")
+
+
+def search_query(q: str) -> Optional[str]:
+    """Turn free text into a prefix tsquery: ``wireless mo`` -> ``'wireless':* & 'mo':*``.
+
+    Terms are passed to Postgres as lexemes rather than through the text
+    parser, so ``GEN-0001`` stays one prefix instead of ``gen`` & ``0001``.
+    """
+    terms = [term.rstrip(".-") for term in _TERM.findall(q.lower())]
+    terms = [term for term in terms if term][:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+class ProductService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def search(
+        self,
+        q: str,
+        limit: int,
+        category_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+    ) -> List[Row]:
+        """Products matching every term of ``q`` in SKU, name or description.
+
+        Ranked by an exact SKU hit first, then by ``ts_rank`` with SKU weighted
+        above name above description and shorter documents preferred. Rows are
+        projected for ``product_row(row, with_stock=True)``.
+        """
+        tsquery = search_query(q)
+        if tsquery is None:
+            raise ValueError("Search query has no searchable terms")
+        terms = cast(literal(tsquery), TSQUERY)
+
+        # Every match is ranked on the narrow (id, sku, vector) rows and only
+        # the top ``limit`` are joined to the wide product columns.
+        rank = case(
+            (func.lower(Product.sku) == q.strip().lower(), 1.0), else_=0.0
+        ) + func.ts_rank(Product.search_vector, terms, 1)
+        matches = select(Product.id, rank.label("rank")).where(
+            Product.search_vector.op("@@")(terms)
+        )
+        if category_id:
+            matches = matches.where(Product.category_id == category_id)
+        if is_active is not None:
+            matches = matches.where(Product.is_active == is_active)
+        matches = (
+            matches.order_by(rank.desc(), Product.id).limit(limit).subquery("matches")
+        )
+
+        query = (
+            select(*PRODUCT_COLUMNS, *CATEGORY_COLUMNS, *STOCK_COLUMNS)
+            .select_from(matches)
+            .join(Product, Product.id == matches.c.id)
+            .join(Category, Category.id == Product.category_id)
+            .outerjoin(Inventory, Inventory.product_id == Product.id)
+            .order_by(matches.c.rank.desc(), Product.id)
+        )
+        return self.db.execute(query).all()
+
+    def import_chunk(
+        self, records: List[Tuple[int, Dict]], report: "ImportReport"
+    ) -> None:
+        """Validate ``(row, record)`` pairs and upsert the valid ones by SKU.
+
+        One transaction per chunk. If a statement fails, the chunk is replayed
+        row by row under savepoints so only the offending rows are reported.
+        """
+        category_ids = {
+            category.id for category in catalog_cache.list_categories(self.db)
+        }
+        products: Dict[str, Tuple[int, ProductCreate]] = {}
+        for row, record in records:
+            try:
+                product = ProductCreate.model_validate(record)
+            except ValidationError as e:
+                report.fail(row, record.get("sku"), _describe(e))
+                continue
+            if product.category_id not in category_ids:
+                report.fail(row, product.sku, "Category not found")
+                continue
+            if product.sku in products:
+                # Only the later row is written; created/updated count what the
+                # upsert did, so the earlier one is reported on its own.
+                report.duplicates += 1
+            products[product.sku] = (row, product)
+
+        if not products:
+            return
+        try:
+            created, updated = self._upsert([p for _, p in products.values()])
+        except DBAPIError:
+            self.db.rollback()
+            created = updated = 0
+            for row, product in products.values():
+                try:
+                    with self.db.begin_nested():
+                        inserted, replaced = self._upsert([product])
+                except DBAPIError as e:
+                    report.fail(row, product.sku, str(e.orig).split("\n")[0])
+                    continue
+                created += inserted
+                updated += replaced
+
+        if updated:
+            # Cached copies of the replaced products are stale in every worker.
+            catalog_cache.notify(self.db, "product")
+        self.db.commit()
+        if updated:
+            catalog_cache.invalidate("product")
+        report.created += created
+        report.updated += updated
+
+    def _upsert(self, products: List[ProductCreate]) -> Tuple[int, int]:
+        """Insert or replace products by (distinct) SKU; new ones get inventory.
+
+        Returns the number of products created and replaced. Stock levels of
+        existing products are left alone; they only change through logged
+        inventory updates.
+        """
+        table = Product.__table__
+        statement = pg_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.sku],
+            set_={
+                **{
+                    field: statement.excluded[field]
+                    for field in IMPORT_FIELDS
+                    if field != "sku"
+                },
+                "updated_at": func.now(),
+            },
+        ).returning(
+            table.c.id,
+            table.c.sku,
+            # xmax is only set on a row version that replaced another.
+            literal_column("(xmax = 0)").label("inserted"),
+        )
+        rows = self.db.execute(
+            statement,
+            [product.model_dump(include=set(IMPORT_FIELDS)) for product in products],
+        ).all()
+        product_ids = {row.sku: row.id for row in rows}
+
+        inventory = pg_insert(Inventory.__table__)
+        self.db.execute(
+            inventory.on_conflict_do_update(
+                index_elements=[Inventory.__table__.c.product_id],
+                set_={"low_stock_threshold": inventory.excluded.low_stock_threshold},
+            ),
+            [
+                {
+                    "product_id": product_ids[product.sku],
+                    "quantity": product.initial_stock,
+                    "low_stock_threshold": product.low_stock_threshold,
+                }
+                for product in products
+            ],
+        )
+        created = sum(1 for row in rows if row.inserted)
+        return created, len(rows) - created
+
+
+class ImportReport:
+    """Running totals of an import, keeping the first ``MAX_IMPORT_ERRORS`` errors."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[ProductImportError] = []
+
+    def fail(self, row: int, sku, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_IMPORT_ERRORS:
+            self.errors.append(
+                ProductImportError(
+                    row=row, sku=sku if isinstance(sku, str) else None, error=error
+                )
+            )
+
+    def response(self) -> ProductImportResponse:
+        return ProductImportResponse(
+            created=self.created,
+            updated=self.updated,
+            duplicates=self.duplicates,
+            failed=self.failed,
+            errors=sorted(self.errors, key=lambda error: error.row),
+        )
+
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+        if len(pending) > MAX_IMPORT_RECORD:
+            raise ValueError(f"Line longer than {MAX_IMPORT_RECORD} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def read_import_records(
+    chunks: AsyncIterator[bytes], fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Parse an uploaded body as it arrives into ``(row, record, error)``.
+
+    ``fmt`` is ``csv`` (a header row naming ``ProductCreate`` fields; empty
+    cells take the field default) or ``ndjson`` (one JSON object per line).
+    Rows are numbered from 1, not counting the CSV header or blank lines.
+    Raises ValueError when the body cannot be read any further.
+    """
+    row = 0
+    if fmt == "ndjson":
+        async for line in _lines(chunks):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield row, None, "Invalid JSON"
+                continue
+            if isinstance(record, dict):
+                yield row, record, None
+            else:
+                yield row, None, "Expected a JSON object"
+        return
+
+    header = None
+    pending: List[str] = []
+    quotes = size = 0
+    async for line in _lines(chunks):
+        pending.append(line)
+        quotes += line.count('"')
+        size += len(line)
+        if size > MAX_IMPORT_RECORD:
+            raise ValueError(f"Record longer than {MAX_IMPORT_RECORD} characters")
+        # An odd number of quotes means a quoted value runs onto the next line.
+        if quotes % 2:
+            continue
+        text = "\n".join(pending)
+        pending, quotes, size = [], 0, 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value}, None
+
+    if pending:
+        yield row + 1, None, "Unterminated quoted value"
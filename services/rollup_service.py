@@ -0,0 +1,104 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Iterable, Mapping
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models import Sale, SalesDailyRollup
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return ``value`` as an aware UTC datetime; naive values are taken as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def start_of_day(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class RollupService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_sales(self, sales: Iterable[Mapping]) -> None:
+        """Fold new sales into the daily rollup inside the caller's transaction."""
+        totals = defaultdict(lambda: [Decimal("0"), 0, 0])
+        for sale in sales:
+            key = (
+                as_utc(sale["sale_date"]).date(),
+                sale["product_id"],
+                sale.get("platform") or "",
+            )
+            totals[key][0] += Decimal(sale["total_amount"])
+            totals[key][1] += 1
+            totals[key][2] += sale["quantity"]
+
+        if not totals:
+            return
+
+        # Sorted so concurrent writers lock rollup rows in the same order.
+        rows = [
+            {
+                "sale_day": sale_day,
+                "product_id": product_id,
+                "platform": platform,
+                "total_revenue": revenue,
+                "order_count": orders,
+                "quantity_sold": quantity,
+            }
+            for (sale_day, product_id, platform), (revenue, orders, quantity) in sorted(
+                totals.items()
+            )
+        ]
+
+        stmt = insert(SalesDailyRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sale_day", "product_id", "platform"],
+            set_={
+                "total_revenue": SalesDailyRollup.total_revenue
+                + stmt.excluded.total_revenue,
+                "order_count": SalesDailyRollup.order_count + stmt.excluded.order_count,
+                "quantity_sold": SalesDailyRollup.quantity_sold
+                + stmt.excluded.quantity_sold,
+            },
+        )
+        self.db.execute(stmt)
+
+    def rebuild(self) -> int:
+        """Recompute the whole rollup from ``sales`` and return the row count."""
+        # Block concurrent sale writes so no increment is lost between the
+        # delete and the backfill.
+        self.db.execute(text("LOCK TABLE sales IN SHARE MODE"))
+        self.db.query(SalesDailyRollup).delete(synchronize_session=False)
+
+        sale_day = func.date(func.timezone("UTC", Sale.sale_date))
+        platform = func.coalesce(Sale.platform, "")
+        backfill = select(
+            sale_day,
+            Sale.product_id,
+            platform,
+            func.sum(Sale.total_amount),
+            func.count(Sale.id),
+            func.sum(Sale.quantity),
+        ).group_by(sale_day, Sale.product_id, platform)
+
+        result = self.db.execute(
+            insert(SalesDailyRollup).from_select(
+                [
+                    "sale_day",
+                    "product_id",
+                    "platform",
+                    "total_revenue",
+                    "order_count",
+                    "quantity_sold",
+                ],
+                backfill,
+            )
+        )
+        self.db.commit()
+        return result.rowcount
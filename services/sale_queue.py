@@ -0,0 +1,175 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from database import SessionLocal
+from schemas import SaleCreate
+from services.sales_service import SalesService
+
+SALE_WRITE_BEHIND = os.getenv("SALE_WRITE_BEHIND", "false").lower() == "true"
+SALE_QUEUE_SIZE = int(os.getenv("SALE_QUEUE_SIZE", "10000"))
+SALE_FLUSH_ROWS = int(os.getenv("SALE_FLUSH_ROWS", "500"))
+SALE_FLUSH_MS = float(os.getenv("SALE_FLUSH_MS", "10"))
+
+logger = logging.getLogger("ecommerce.sale_queue")
+
+Pending = Tuple[SaleCreate, Future]
+
+
+class QueueFull(Exception):
+    """The write-behind queue is at capacity; the caller should retry later."""
+
+
+class SaleQueue:
+    """Bounded write-behind queue that group-commits sales.
+
+    Requests validate a sale, stamp its ``sale_date`` and ``submit`` it; a
+    flusher thread drains the queue and records up to ``flush_rows`` sales,
+    or whatever arrived within ``flush_ms`` of the first one, through
+    ``SalesService.stage_sales``: one transaction and one commit for the
+    whole group, inventory decrements included. Each sale's future resolves
+    to its id once that commit is durable, or to the error that kept it out.
+    A group that fails before its commit is replayed one sale at a time; a
+    failed commit is never replayed, since it may have been applied.
+
+    Sales accepted without waiting live only in this worker's memory until
+    their group commits, and are lost if the process dies first.
+    """
+
+    def __init__(self, maxsize: int, flush_rows: int, flush_ms: float):
+        self.maxsize = maxsize
+        self.flush_rows = flush_rows
+        self.flush_ms = flush_ms
+        self._queue: "queue.Queue[Pending]" = queue.Queue(maxsize)
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.committed = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, sale: SaleCreate) -> Future:
+        future = Future()
+        try:
+            self._queue.put_nowait((sale, future))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFull(f"Sale queue is full ({self.maxsize} pending)")
+        self.accepted += 1
+        return future
+
+    # -- flushing, on the flusher thread -----------------------------------
+
+    def _next_batch(self) -> List[Pending]:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_ms / 1000
+        while len(batch) < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _fail(self, batch: List[Pending], error: Exception) -> None:
+        for sale, future in batch:
+            logger.error("Dropped queued sale %s: %s", sale.model_dump_json(), error)
+            self.failed += 1
+            future.set_exception(error)
+
+    def _flush(self, batch: List[Pending]) -> None:
+        db = SessionLocal()
+        try:
+            staged = SalesService(db).stage_sales([sale for sale, _ in batch])
+        except Exception as e:
+            db.close()
+            if len(batch) == 1:
+                self._fail(batch, e)
+            else:
+                # Nothing was committed: find the sale that broke the group,
+                # the rest still go in.
+                for pending in batch:
+                    self._flush([pending])
+            return
+
+        try:
+            if staged.rows:
+                db.commit()
+        except Exception as e:
+            # The commit may have landed anyway; replaying the group could
+            # record its sales and stock deductions twice.
+            logger.exception("Commit of %d queued sales failed", len(batch))
+            self._fail(batch, e)
+            return
+        finally:
+            db.close()
+
+        self.batches += 1
+        for (_, future), item in zip(batch, staged.response.results):
+            if item.error:
+                self.failed += 1
+                future.set_exception(ValueError(item.error))
+            else:
+                self.committed += 1
+                future.set_result(item.sale_id)
+        if staged.rows:
+            SalesService.announce_sales(staged)
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._stop.clear()
+            self._flusher = threading.Thread(
+                target=self._run, name="sale-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def stop(self, timeout: float = 30) -> None:
+        """Flush what is queued, then stop the flusher."""
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join(timeout)
+            self._flusher = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SALE_WRITE_BEHIND,
+            "depth": self._queue.qsize(),
+            "capacity": self.maxsize,
+            "flush_rows": self.flush_rows,
+            "flush_ms": self.flush_ms,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "committed": self.committed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch": self.committed / self.batches if self.batches else 0.0,
+        }
+
+
+sale_queue = SaleQueue(SALE_QUEUE_SIZE, SALE_FLUSH_ROWS, SALE_FLUSH_MS)
+
+
+def start_sale_queue() -> None:
+    if SALE_WRITE_BEHIND:
+        sale_queue.start()
+
+
+def stop_sale_queue() -> None:
+    sale_queue.stop()
@@ -1,18 +1,210 @@
-from datetime import datetime
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from sqlalchemy import and_, func
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, or_, select, union_all
+from sqlalchemy.orm import Query, Session
 
-from models import Product, Sale
-from schemas import RevenueComparison, SalesAnalytics
+from models import Category, Product, Sale, SalesDailyRollup
+from schemas import (RevenueComparison, SaleBatchItemResult, SaleBatchResponse,
+                     SaleCreate, SalesAnalytics, SalesTimeSeries,
+                     SalesTimeSeriesPoint, TimeSeriesInterval, TopSales,
+                     TopSalesDimension, TopSalesItem, TopSalesMetric)
+from services.analytics_cache import analytics_cache
+from services.catalog_cache import catalog_cache
+from services.inventory_service import InventoryService
+from services.live_events import live_events
+from services.rollup_service import RollupService, as_utc, start_of_day
+
+MAX_TIMESERIES_BUCKETS = 10000
+
+logger = logging.getLogger("ecommerce.sales")
+
+
+def _truncate(value: datetime, interval: TimeSeriesInterval) -> datetime:
+    """Python mirror of Postgres ``date_trunc`` for the supported intervals."""
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if interval == TimeSeriesInterval.HOUR:
+        return value
+    value = value.replace(hour=0)
+    if interval == TimeSeriesInterval.WEEK:
+        return value - timedelta(days=value.weekday())
+    if interval == TimeSeriesInterval.MONTH:
+        return value.replace(day=1)
+    return value
+
+
+def _next_bucket(value: datetime, interval: TimeSeriesInterval) -> datetime:
+    if interval == TimeSeriesInterval.HOUR:
+        return value + timedelta(hours=1)
+    if interval == TimeSeriesInterval.DAY:
+        return value + timedelta(days=1)
+    if interval == TimeSeriesInterval.WEEK:
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def _split_window(start: datetime, end: datetime) -> Tuple[Optional[Any], Any]:
+    """Split ``[start, end]`` into rollup and raw-sales criteria.
+
+    Whole UTC days inside the window are read from the daily rollup; only the
+    partial days at either edge are aggregated from raw sales. The rollup
+    criterion is ``None`` when the window contains no whole day.
+    """
+    first_full_day = start.date()
+    if start != start_of_day(first_full_day):
+        first_full_day += timedelta(days=1)
+    last_partial_day = end.date()
+
+    if first_full_day >= last_partial_day:
+        return None, and_(Sale.sale_date >= start, Sale.sale_date <= end)
+
+    rollup_days = and_(
+        SalesDailyRollup.sale_day >= first_full_day,
+        SalesDailyRollup.sale_day < last_partial_day,
+    )
+    raw_window = or_(
+        and_(Sale.sale_date >= start, Sale.sale_date < start_of_day(first_full_day)),
+        and_(Sale.sale_date >= start_of_day(last_partial_day), Sale.sale_date <= end),
+    )
+    return rollup_days, raw_window
+
+
+class StagedSales(NamedTuple):
+    response: SaleBatchResponse
+    rows: List[dict]
+    sale_ids: List[int]
+    stock_changes: List[Any]
+    category_ids: Dict[int, int]
 
 
 class SalesService:
     def __init__(self, db: Session):
         self.db = db
 
+    def create_sales(self, sales: List[SaleCreate]) -> SaleBatchResponse:
+        """Record many sales in one transaction using set-based statements."""
+        staged = self.stage_sales(sales)
+        if staged.rows:
+            self.db.commit()
+            self.announce_sales(staged)
+        return staged.response
+
+    def stage_sales(
+        self, sales: List[SaleCreate], reason: str = "Sales batch"
+    ) -> "StagedSales":
+        """Write sales, stock decrements and rollups without committing.
+
+        Nothing is visible to other sessions until the caller commits, and
+        the caches and live events are only told through ``announce_sales``
+        once it has.
+        """
+        requested_ids = {sale.product_id for sale in sales}
+        category_ids = {
+            product_id: product.category_id
+            for product_id, product in catalog_cache.get_products(
+                self.db, requested_ids
+            ).items()
+        }
+
+        now = datetime.now(timezone.utc)
+        errors = {}
+        rows = []
+        for index, sale in enumerate(sales):
+            if sale.product_id not in category_ids:
+                errors[index] = "Product not found"
+                continue
+
+            row = sale.model_dump()
+            # Aware, so timestamptz stores the same UTC day the rollup uses.
+            row["sale_date"] = as_utc(row["sale_date"] or now)
+            row["total_amount"] = sale.quantity * sale.unit_price
+            rows.append(row)
+
+        sale_ids = []
+        stock_changes = []
+        if rows:
+            # Core multi-row INSERT ... RETURNING, ids come back in input order.
+            sale_ids = self.db.scalars(
+                insert(Sale.__table__).returning(
+                    Sale.__table__.c.id, sort_by_parameter_order=True
+                ),
+                rows,
+            ).all()
+
+            sold = Counter()
+            for row in rows:
+                sold[row["product_id"]] += row["quantity"]
+            stock_changes = InventoryService(self.db).deduct_sold_stock(
+                sold, reason=reason
+            )
+            RollupService(self.db).record_sales(rows)
+
+        created = iter(sale_ids)
+        results = [
+            SaleBatchItemResult(index=index, error=errors[index])
+            if index in errors
+            else SaleBatchItemResult(index=index, sale_id=next(created))
+            for index in range(len(sales))
+        ]
+
+        response = SaleBatchResponse(
+            created=len(rows), failed=len(sales) - len(rows), results=results
+        )
+        return StagedSales(response, rows, sale_ids, stock_changes, category_ids)
+
+    @staticmethod
+    def announce_sales(staged: "StagedSales") -> None:
+        """Invalidate analytics and publish live events for committed sales.
+
+        The sales are already stored, so a failing step is logged and the
+        remaining steps still run.
+        """
+        steps = (
+            lambda: analytics_cache.invalidate_sales(
+                (
+                    row["sale_date"],
+                    row["product_id"],
+                    staged.category_ids[row["product_id"]],
+                    row["platform"],
+                )
+                for row in staged.rows
+            ),
+            lambda: live_events.publish_sales(staged.rows, staged.sale_ids),
+            lambda: live_events.publish_stock_changes(staged.stock_changes),
+        )
+        for step in steps:
+            try:
+                step()
+            except Exception:
+                logger.exception("Post-commit step failed for committed sales")
+
+    @staticmethod
+    def _apply_filters(
+        query: Query,
+        source,
+        product_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+    ) -> Query:
+        """Apply the shared analytics filters to a query over ``Sale`` or a rollup."""
+        if product_id:
+            query = query.filter(source.product_id == product_id)
+
+        if category_id:
+            query = query.join(Product, Product.id == source.product_id).filter(
+                Product.category_id == category_id
+            )
+
+        if platform:
+            query = query.filter(source.platform == platform)
+
+        return query
+
     def get_sales_analytics(
         self,
         start_date: datetime,
@@ -21,31 +213,230 @@ class SalesService:
         category_id: Optional[int] = None,
         platform: Optional[str] = None,
     ) -> SalesAnalytics:
-        query = self.db.query(
+        filters = dict(
+            product_id=product_id, category_id=category_id, platform=platform
+        )
+        start = as_utc(start_date)
+        end = as_utc(end_date)
+        rollup_days, raw_window = _split_window(start, end)
+
+        total_revenue = Decimal("0")
+        total_orders = 0
+        total_quantity_sold = 0
+
+        if rollup_days is not None:
+            rollup_query = self.db.query(
+                func.sum(SalesDailyRollup.total_revenue).label("total_revenue"),
+                func.sum(SalesDailyRollup.order_count).label("total_orders"),
+                func.sum(SalesDailyRollup.quantity_sold).label("total_quantity_sold"),
+            ).filter(rollup_days)
+            rollup = self._apply_filters(
+                rollup_query, SalesDailyRollup, **filters
+            ).first()
+
+            total_revenue += rollup.total_revenue or Decimal("0")
+            total_orders += rollup.total_orders or 0
+            total_quantity_sold += rollup.total_quantity_sold or 0
+
+        raw_query = self.db.query(
             func.sum(Sale.total_amount).label("total_revenue"),
             func.count(Sale.id).label("total_orders"),
             func.sum(Sale.quantity).label("total_quantity_sold"),
-            func.avg(Sale.total_amount).label("average_order_value"),
-        ).filter(and_(Sale.sale_date >= start_date, Sale.sale_date <= end_date))
+        ).filter(raw_window)
+        raw = self._apply_filters(raw_query, Sale, **filters).first()
 
-        if product_id:
-            query = query.filter(Sale.product_id == product_id)
+        total_revenue += raw.total_revenue or Decimal("0")
+        total_orders += raw.total_orders or 0
+        total_quantity_sold += raw.total_quantity_sold or 0
 
-        if category_id:
-            query = query.join(Product).filter(Product.category_id == category_id)
+        return SalesAnalytics(
+            total_revenue=total_revenue,
+            total_orders=total_orders,
+            total_quantity_sold=total_quantity_sold,
+            average_order_value=(
+                total_revenue / total_orders if total_orders else Decimal("0")
+            ),
+            period_start=start_date,
+            period_end=end_date,
+        )
 
-        if platform:
-            query = query.filter(Sale.platform == platform)
+    def get_top_sales(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        dimension: TopSalesDimension,
+        metric: TopSalesMetric,
+        limit: int,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+    ) -> TopSales:
+        """Rank products, categories or platforms by revenue or quantity.
 
-        result = query.first()
+        Rollup and raw-edge aggregates are combined, ranked and cut to
+        ``limit`` in one statement; a window sum over every group gives the
+        total that each item's share is measured against.
+        """
+        rollup_days, raw_window = _split_window(as_utc(start_date), as_utc(end_date))
 
-        return SalesAnalytics(
-            total_revenue=result.total_revenue or Decimal("0"),
-            total_orders=result.total_orders or 0,
-            total_quantity_sold=result.total_quantity_sold or 0,
-            average_order_value=result.average_order_value or Decimal("0"),
+        def grouped(source, window):
+            if source is Sale:
+                revenue = func.sum(Sale.total_amount)
+                orders = func.count(Sale.id)
+                quantity = func.sum(Sale.quantity)
+                platform_column = func.coalesce(Sale.platform, "")
+            else:
+                revenue = func.sum(SalesDailyRollup.total_revenue)
+                orders = func.sum(SalesDailyRollup.order_count)
+                quantity = func.sum(SalesDailyRollup.quantity_sold)
+                platform_column = SalesDailyRollup.platform
+
+            filters = dict(category_id=category_id, platform=platform)
+            if dimension == TopSalesDimension.PRODUCT:
+                key = source.product_id
+            elif dimension == TopSalesDimension.PLATFORM:
+                key = platform_column
+            else:
+                key = Product.category_id
+
+            query = select(
+                key.label("key"),
+                revenue.label("revenue"),
+                orders.label("orders"),
+                quantity.label("quantity"),
+            ).where(window)
+            if dimension == TopSalesDimension.CATEGORY:
+                query = query.join(Product, Product.id == source.product_id)
+                if category_id:
+                    query = query.where(Product.category_id == category_id)
+                filters.pop("category_id")
+            return self._apply_filters(query, source, **filters).group_by(key)
+
+        parts = [grouped(Sale, raw_window)]
+        if rollup_days is not None:
+            parts.append(grouped(SalesDailyRollup, rollup_days))
+        combined = union_all(*parts).subquery("combined")
+
+        measured = (
+            combined.c.revenue
+            if metric == TopSalesMetric.REVENUE
+            else combined.c.quantity
+        )
+        ranked = (
+            select(
+                combined.c.key,
+                func.sum(combined.c.revenue).label("total_revenue"),
+                func.sum(combined.c.orders).label("total_orders"),
+                func.sum(combined.c.quantity).label("total_quantity_sold"),
+                func.sum(measured).label("measured"),
+                func.sum(func.sum(measured)).over().label("total"),
+            )
+            .group_by(combined.c.key)
+            .order_by(func.sum(measured).desc(), combined.c.key)
+            .limit(limit)
+            .subquery("ranked")
+        )
+
+        if dimension == TopSalesDimension.PRODUCT:
+            query = select(ranked, Product.name.label("name")).outerjoin(
+                Product, Product.id == ranked.c.key
+            )
+        elif dimension == TopSalesDimension.CATEGORY:
+            query = select(ranked, Category.name.label("name")).outerjoin(
+                Category, Category.id == ranked.c.key
+            )
+        else:
+            query = select(ranked, ranked.c.key.label("name"))
+        rows = self.db.execute(
+            query.order_by(ranked.c.measured.desc(), ranked.c.key)
+        ).all()
+
+        total = rows[0].total if rows else Decimal("0")
+        items = [
+            TopSalesItem(
+                id=None if dimension == TopSalesDimension.PLATFORM else row.key,
+                # Sales without a platform are grouped under the empty string.
+                name=row.name or None,
+                total_revenue=row.total_revenue,
+                total_orders=row.total_orders,
+                total_quantity_sold=row.total_quantity_sold,
+                share=float(row.measured / total) if total else 0.0,
+            )
+            for row in rows
+        ]
+
+        return TopSales(
+            dimension=dimension,
+            metric=metric,
+            period_start=start_date,
+            period_end=end_date,
+            total=total,
+            items=items,
+        )
+
+    def get_sales_timeseries(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        interval: TimeSeriesInterval,
+        product_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+    ) -> SalesTimeSeries:
+        # Buckets are UTC wall-clock times, matching the daily rollup.
+        start = as_utc(start_date).replace(tzinfo=None)
+        end = as_utc(end_date).replace(tzinfo=None)
+
+        bucket_starts: List[datetime] = []
+        bucket = _truncate(start, interval)
+        while bucket <= end:
+            bucket_starts.append(bucket)
+            if len(bucket_starts) > MAX_TIMESERIES_BUCKETS:
+                raise ValueError(
+                    f"Range spans more than {MAX_TIMESERIES_BUCKETS} buckets; "
+                    "use a wider interval"
+                )
+            bucket = _next_bucket(bucket, interval)
+
+        bucket_column = func.date_trunc(
+            interval.value, func.timezone("UTC", Sale.sale_date)
+        ).label("bucket_start")
+        query = self.db.query(
+            bucket_column,
+            func.sum(Sale.total_amount).label("total_revenue"),
+            func.count(Sale.id).label("total_orders"),
+            func.sum(Sale.quantity).label("total_quantity_sold"),
+        ).filter(
+            and_(
+                Sale.sale_date >= as_utc(start_date), Sale.sale_date <= as_utc(end_date)
+            )
+        )
+        query = self._apply_filters(
+            query,
+            Sale,
+            product_id=product_id,
+            category_id=category_id,
+            platform=platform,
+        ).group_by(bucket_column)
+
+        rows = {row.bucket_start: row for row in query.all()}
+
+        points = []
+        for bucket_start in bucket_starts:
+            row = rows.get(bucket_start)
+            points.append(
+                SalesTimeSeriesPoint(
+                    bucket_start=bucket_start,
+                    total_revenue=row.total_revenue if row else Decimal("0"),
+                    total_orders=row.total_orders if row else 0,
+                    total_quantity_sold=row.total_quantity_sold if row else 0,
+                )
+            )
+
+        return SalesTimeSeries(
+            interval=interval,
             period_start=start_date,
             period_end=end_date,
+            points=points,
         )
 
     def get_revenue_comparison(
@@ -54,7 +445,7 @@ class SalesService:
         current_end: datetime,
         previous_start: datetime,
         previous_end: datetime,
-        **filters
+        **filters,
     ) -> RevenueComparison:
         current_analytics = self.get_sales_analytics(
             current_start, current_end, **filters
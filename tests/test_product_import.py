@@ -0,0 +1,99 @@
+import pytest
+
+from services import product_service
+from services.product_service import _lines, read_import_records
+
+
+async def _body(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+async def _records(fmt: str, *parts: bytes):
+    return await _collect(read_import_records(_body(*parts), fmt))
+
+
+@pytest.mark.asyncio
+async def test_lines_join_chunks_and_keep_the_last_line():
+    lines = await _collect(_lines(_body(b"one\ntw", b"o\n", b"three")))
+    assert lines == ["one", "two", "three"]
+
+
+@pytest.mark.asyncio
+async def test_lines_strip_a_leading_bom_only():
+    lines = await _collect(_lines(_body(b"\xef\xbb", b"\xbfa\n\xef\xbb\xbfb\n")))
+    assert lines == ["a", "\ufeffb"]
+
+
+@pytest.mark.asyncio
+async def test_lines_decode_characters_split_across_chunks():
+    assert await _collect(_lines(_body(b"caf\xc3", b"\xa9\n"))) == ["café"]
+
+
+@pytest.mark.asyncio
+async def test_lines_reject_overlong_lines(monkeypatch):
+    monkeypatch.setattr(product_service, "MAX_IMPORT_RECORD", 5)
+    with pytest.raises(ValueError, match="longer than 5"):
+        await _collect(_lines(_body(b"ok\n", b"0123456789")))
+
+
+@pytest.mark.asyncio
+async def test_ndjson_records_and_row_numbers():
+    records = await _records(
+        "ndjson", b'{"sku": "A"}\n\n  \n[1]\nnot json\n{"sku": "B"}'
+    )
+    assert records == [
+        (1, {"sku": "A"}, None),
+        (2, None, "Expected a JSON object"),
+        (3, None, "Invalid JSON"),
+        (4, {"sku": "B"}, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_header_bom_and_empty_cells():
+    records = await _records("csv", b"\xef\xbb\xbfsku, name ,price\r\nA,Alpha,\r\n")
+    assert records == [(1, {"sku": "A", "name": "Alpha"}, None)]
+
+
+@pytest.mark.asyncio
+async def test_csv_quoted_values_span_lines_and_chunks():
+    records = await _records(
+        "csv",
+        b'sku,description\nA,"first\n\nsec',
+        b'ond, ""quoted"""\n\nB,plain\n',
+    )
+    assert records == [
+        (1, {"sku": "A", "description": 'first\n\nsecond, "quoted"'}, None),
+        (2, {"sku": "B", "description": "plain"}, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_column_count_mismatch_is_a_row_error():
+    records = await _records("csv", b"sku,name\nA\nB,Beta,extra\nC,Gamma\n")
+    assert records == [
+        (1, None, "Expected 2 columns, got 1"),
+        (2, None, "Expected 2 columns, got 3"),
+        (3, {"sku": "C", "name": "Gamma"}, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_unterminated_quote_is_reported_after_the_last_row():
+    records = await _records("csv", b'sku,name\nA,Alpha\nB,"never closed\nC,x\n')
+    assert records == [
+        (1, {"sku": "A", "name": "Alpha"}, None),
+        (2, None, "Unterminated quoted value"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_csv_rejects_overlong_records(monkeypatch):
+    monkeypatch.setattr(product_service, "MAX_IMPORT_RECORD", 10)
+    with pytest.raises(ValueError, match="Record longer than 10"):
+        await _records("csv", b'sku,name\nA,"12345\n67890\n"\n')
@@ -0,0 +1,35 @@
+import pytest
+
+from services.product_service import MAX_SEARCH_TERMS, search_query
+
+
+@pytest.mark.parametrize(
+    "q, expected",
+    [
+        ("wireless mo", "'wireless':* & 'mo':*"),
+        (" WiReLess ", "'wireless':*"),
+        # A SKU stays one prefix instead of being split at the hyphen.
+        ("GEN-0001", "'gen-0001':*"),
+        # Trailing separators are not part of the term.
+        ("usb-c.", "'usb-c':*"),
+        ("abc.-", "'abc':*"),
+        ("Café", "'café':*"),
+    ],
+)
+def test_search_query_builds_prefix_terms(q, expected):
+    assert search_query(q) == expected
+
+
+def test_search_query_never_passes_quotes_through():
+    assert search_query("o'brien") == "'o':* & 'brien':*"
+    assert search_query("x' | 'y") == "'x':* & 'y':*"
+
+
+@pytest.mark.parametrize("q", ["", "   ", "-- ..", "'&|!"])
+def test_search_query_without_terms(q):
+    assert search_query(q) is None
+
+
+def test_search_query_caps_terms():
+    terms = [f"t{n}" for n in range(MAX_SEARCH_TERMS + 3)]
+    assert search_query(" ".join(terms)).count(":*") == MAX_SEARCH_TERMS